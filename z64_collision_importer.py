@@ -26,84 +26,236 @@ import bpy_extras.io_utils
 import bmesh
 import mathutils
 
+import numpy as np
+
 import re
 import struct
 import random
 import math
+import json
+import os
+import concurrent.futures
+import zlib
 from typing import Any
-from collections.abc import Callable
+
+# names of the polytype enum values, missing values are shown in hex
+OOT_POLYTYPE_ENUM_ITEMS = {
+    "floor": (
+        ("0", "Default", "", 0),
+        ("5", "Void to Scene", "Void out to the last scene entered", 5),
+        ("6", "Climb (vines)", "Instead of jumping, climb down", 6),
+        ("8", "Grab ledge", "Instead of jumping, hang from ledge", 8),
+        (
+            "9",
+            "Step off",
+            "Instead of jumping, step off the platform into falling state",
+            9,
+        ),
+        ("B", "Dive", "Instead of jumping, activate diving animation/state", 0xB),
+        ("C", "Void to Room", "Void out to the last room entered", 0xC),
+    ),
+    "wall": (
+        ("0", "None", "", 0),
+        (
+            "1",
+            "No Grab",
+            "Link will not jump over or attempt to climb the wall,\n"
+            "even if the wall is short enough for these actions",
+            1,
+        ),
+        ("2", "Ladder", "", 2),
+        ("3", "Ladder Top", "Makes Link climb down onto a ladder", 3),
+        ("4", "Vines", "Climbable vine wall", 4),
+        ("5", "Crawl", "Wall used to activate/deactivate crawling", 5),
+        ("6", "Crawl 1", "Difference from Crawl unknown", 6),
+        ("7", "Pushblock", "", 7),
+    ),
+    "special": (
+        ("0", "None", "", 0),
+        (
+            "1",
+            "0x1 ? Camera Related?",
+            'wiki: "Used in Haunted Wasteland. Part of Function 80036870"',
+            1,
+        ),
+        ("2", "Lava", "", 2),
+        ("3", "Lava 1", "Difference from Lava unknown", 3),
+        ("4", "Shallow Sand", "", 4),
+        ("5", "Slippery", "", 5),
+        ("6", "No Fall Damage", "", 6),
+        ("7", "Quicksand (no horse)", "Quicksand, NOT passable on horseback", 7),
+        (
+            "8",
+            "Bleeding Wall",
+            'Spawns "blood" particles when struck,\n'
+            "special sound when struck with sword (used in Jabu-Jabu's Belly)",
+            8,
+        ),
+        ("9", "Void on Contact", "Instantly void out on contact", 9),
+        # ('A','Unused?','',0xA),
+        ("B", "Look Up", "Makes the player look upwards when standing on it", 0xB),
+        ("C", "Quicksand (horse)", "Quicksand, passable on horseback", 0xC),
+    ),
+    "conveyor_speed": (
+        ("0", "None", "", 0),
+        ("1", "Slow", "", 1),
+        ("2", "Mid", "", 2),
+        ("3", "Fast", "", 3),
+        # ('4','Preserve 4','keeps momentum when entering after stepping on a polygon with speed 1-3',4),
+        # ('5','Preserve 5','same as 4?',5),
+        # ('6','Preserve 6','same as 4?',6),
+        # ('7','Preserve 7','same as 4?',7),
+    ),
+    "slope": (
+        ("0", "Flat", "", 0),
+        ("1", "Sloped", "Steep Surface (makes the player slide)", 1),
+        (
+            "2",
+            "Flat, Keep Temp Flags",
+            "Flat, preserves scene temporary flags on scene exit",
+            2,
+        ),
+    ),
+    "sound": (
+        ("0", "Earth/Dirt", "", 0),
+        ("1", "Sand", "", 1),
+        ("2", "Stone", "", 2),
+        ("3", "Stone (wet)", "", 3),
+        ("4", "Shallow Water", "", 4),
+        ("5", "Shallow Water (lower-pitched)", "", 5),
+        ("6", "Underbrush/Grass", "", 6),
+        ("7", "Lava/Goo", "", 7),
+        ("8", "Earth/Dirt", "", 8),
+        ("9", "Wooden Plank", "", 9),
+        ("A", "Packed Earth/Wood (struck: wooden sound)", "", 0xA),
+        ("B", "Earth/Dirt", "", 0xB),
+        ("C", "Ceramic", "", 0xC),
+        ("D", "Loose Earth/Dirt", "", 0xD),
+        # ('E','Earth/dirt','',0xE),
+        # ('F','Earth/dirt','',0xF),
+    ),
+}
+
+# (property name, word (0: high, 1: low), shift, mask, kind)
+# found the wiki source on accident https://discordapp.com/channels/388361645073629187/388362111534759942/535678606324793354
+OOT_POLYTYPE_FIELDS = (
+    # polytype high word
+    ("no_horse", 0, 31, 1, "bool"),
+    ("minus_one_unit", 0, 30, 1, "bool"),
+    ("floor", 0, 26, 0xF, "enum"),
+    ("wall", 0, 21, 0x1F, "enum"),
+    # polytype_hi >> 18 & 7 # unused
+    ("special", 0, 13, 0x1F, "enum"),
+    ("exit", 0, 8, 0x1F, "int"),
+    ("camera", 0, 0, 0xFF, "int"),
+    # polytype low word
+    # polytype_lo >> 28 & 0b1111 # padding
+    ("wall_damage", 1, 27, 1, "bool"),
+    ("conveyor_direction", 1, 21, 0x3F, "int"),
+    ("conveyor_speed", 1, 18, 7, "enum"),
+    ("hookshot", 1, 17, 1, "bool"),
+    ("echo", 1, 11, 0x3F, "int"),
+    ("lighting", 1, 6, 0x1F, "int"),
+    ("slope", 1, 4, 3, "enum"),
+    ("sound", 1, 0, 0xF, "enum"),
+)
+
+
+class GameProfile:
+    """Polytype and polygon flag bit layouts, and value names of a game."""
+
+    def __init__(
+        self,
+        name: str,
+        polytype_fields: tuple[tuple[str, int, int, int, str], ...],
+        polytype_enum_items: dict[str, tuple[tuple[str, str, str, int], ...]],
+        void_floor_types: tuple[int, ...],
+        # polygon vertex words: the vertex index bits, with the ignore flags
+        # above them in the first word and the conveyor flag in the second word
+        vertex_index_mask: int = 0x1FFF,
+        conveyor_flag: int = 0x2000,
+    ):
+        self.name = name
+        self.polytype_fields = polytype_fields
+        self.void_floor_types = void_floor_types
+        self.vertex_index_mask = vertex_index_mask
+        self.conveyor_flag = conveyor_flag
+        # list every value the bits can hold, so that any polytype can be set
+        masks = {field[0]: field[3] for field in polytype_fields}
+        self.polytype_enum_items = dict[str, tuple[tuple[str, str, str, int], ...]]()
+        for attr, items in polytype_enum_items.items():
+            named_items = {item[3]: item for item in items}
+            self.polytype_enum_items[attr] = tuple(
+                named_items.get(value, (f"{value:X}", f"0x{value:X}", "", value))
+                for value in range(masks[attr] + 1)
+            )
+
+    def decode_polytype(self, polytype_hi: int, polytype_lo: int):
+        """Values of the polytype properties, as set on the material properties."""
+        words = (polytype_hi, polytype_lo)
+        values = dict[str, Any]()
+        for attr, word, shift, mask, kind in self.polytype_fields:
+            value = words[word] >> shift & mask
+            if kind == "bool":
+                value = value != 0
+            elif kind == "enum":
+                value = f"{value:X}"
+            values[attr] = value
+        return values
+
+    def decode_polygon_vertex_words(self, vtx: np.ndarray):
+        """(vertex indices, ignore flags, enable conveyor) of a (n, 3) array of
+        polygon vertex words."""
+        return (
+            vtx & self.vertex_index_mask,
+            vtx[:, 0] >> self.vertex_index_mask.bit_length(),
+            (vtx[:, 1] & self.conveyor_flag) != 0,
+        )
+
+    def decode_polytypes(self, polytypes: np.ndarray):
+        """Integer values of the polytype fields for a (n, 2) array of polytypes."""
+        return {
+            attr: (polytypes[:, word] >> shift) & mask
+            for attr, word, shift, mask, kind in self.polytype_fields
+        }
+
+
+GAME_PROFILES = {
+    "OOT": GameProfile(
+        "Ocarina of Time",
+        OOT_POLYTYPE_FIELDS,
+        OOT_POLYTYPE_ENUM_ITEMS,
+        void_floor_types=(0x5, 0xC),
+    ),
+}
+
+GAME_ITEMS = tuple(
+    (game, profile.name, "", i)
+    for i, (game, profile) in enumerate(GAME_PROFILES.items())
+)
+
+
+def polytype_enum_items_factory(attr):
+    def polytype_enum_items(self, context):
+        return GAME_PROFILES[self.game].polytype_enum_items[attr]
+
+    return polytype_enum_items
 
 
 class ZELDA64_ImportMeshCollision_SceneProperties(bpy.types.PropertyGroup):
     reduced_info: bpy.props.BoolProperty()
+    overview_index: bpy.props.IntProperty()
 
 
 class ZELDA64_MaterialMeshCollisionPolytypeProperties(bpy.types.PropertyGroup):
+    # selects the enum items below
+    game: bpy.props.EnumProperty(items=GAME_ITEMS)
     # high word
     no_horse: bpy.props.BoolProperty()
     minus_one_unit: bpy.props.BoolProperty()
-    floor: bpy.props.EnumProperty(
-        items=(
-            ("0", "Default", "", 0),
-            ("5", "Void to Scene", "Void out to the last scene entered", 5),
-            ("6", "Climb (vines)", "Instead of jumping, climb down", 6),
-            ("8", "Grab ledge", "Instead of jumping, hang from ledge", 8),
-            (
-                "9",
-                "Step off",
-                "Instead of jumping, step off the platform into falling state",
-                9,
-            ),
-            ("B", "Dive", "Instead of jumping, activate diving animation/state", 0xB),
-            ("C", "Void to Room", "Void out to the last room entered", 0xC),
-        )
-    )
-    wall: bpy.props.EnumProperty(
-        items=(
-            ("0", "None", "", 0),
-            (
-                "1",
-                "No Grab",
-                "Link will not jump over or attempt to climb the wall,\n"
-                "even if the wall is short enough for these actions",
-                1,
-            ),
-            ("2", "Ladder", "", 2),
-            ("3", "Ladder Top", "Makes Link climb down onto a ladder", 3),
-            ("4", "Vines", "Climbable vine wall", 4),
-            ("5", "Crawl", "Wall used to activate/deactivate crawling", 5),
-            ("6", "Crawl 1", "Difference from Crawl unknown", 6),
-            ("7", "Pushblock", "", 7),
-        )
-    )
-    special: bpy.props.EnumProperty(
-        items=(
-            ("0", "None", "", 0),
-            (
-                "1",
-                "0x1 ? Camera Related?",
-                'wiki: "Used in Haunted Wasteland. Part of Function 80036870"',
-                1,
-            ),
-            ("2", "Lava", "", 2),
-            ("3", "Lava 1", "Difference from Lava unknown", 3),
-            ("4", "Shallow Sand", "", 4),
-            ("5", "Slippery", "", 5),
-            ("6", "No Fall Damage", "", 6),
-            ("7", "Quicksand (no horse)", "Quicksand, NOT passable on horseback", 7),
-            (
-                "8",
-                "Bleeding Wall",
-                'Spawns "blood" particles when struck,\n'
-                "special sound when struck with sword (used in Jabu-Jabu's Belly)",
-                8,
-            ),
-            ("9", "Void on Contact", "Instantly void out on contact", 9),
-            # ('A','Unused?','',0xA),
-            ("B", "Look Up", "Makes the player look upwards when standing on it", 0xB),
-            ("C", "Quicksand (horse)", "Quicksand, passable on horseback", 0xC),
-        )
-    )
+    floor: bpy.props.EnumProperty(items=polytype_enum_items_factory("floor"))
+    wall: bpy.props.EnumProperty(items=polytype_enum_items_factory("wall"))
+    special: bpy.props.EnumProperty(items=polytype_enum_items_factory("special"))
     exit: bpy.props.IntProperty()
     camera: bpy.props.IntProperty()
     # low word
@@ -113,52 +265,13 @@ class ZELDA64_MaterialMeshCollisionPolytypeProperties(bpy.types.PropertyGroup):
     # -> in-game axes: 0x10 is +x, 0x00 is +z
     conveyor_direction: bpy.props.IntProperty()
     conveyor_speed: bpy.props.EnumProperty(
-        items=(
-            ("0", "None", "", 0),
-            ("1", "Slow", "", 1),
-            ("2", "Mid", "", 2),
-            ("3", "Fast", "", 3),
-            # ('4','Preserve 4','keeps momentum when entering after stepping on a polygon with speed 1-3',4),
-            # ('5','Preserve 5','same as 4?',5),
-            # ('6','Preserve 6','same as 4?',6),
-            # ('7','Preserve 7','same as 4?',7),
-        )
+        items=polytype_enum_items_factory("conveyor_speed")
     )
     hookshot: bpy.props.BoolProperty()
     echo: bpy.props.IntProperty()
     lighting: bpy.props.IntProperty()
-    slope: bpy.props.EnumProperty(
-        items=(
-            ("0", "Flat", "", 0),
-            ("1", "Sloped", "Steep Surface (makes the player slide)", 1),
-            (
-                "2",
-                "Flat, Keep Temp Flags",
-                "Flat, preserves scene temporary flags on scene exit",
-                2,
-            ),
-        )
-    )
-    sound: bpy.props.EnumProperty(
-        items=(
-            ("0", "Earth/Dirt", "", 0),
-            ("1", "Sand", "", 1),
-            ("2", "Stone", "", 2),
-            ("3", "Stone (wet)", "", 3),
-            ("4", "Shallow Water", "", 4),
-            ("5", "Shallow Water (lower-pitched)", "", 5),
-            ("6", "Underbrush/Grass", "", 6),
-            ("7", "Lava/Goo", "", 7),
-            ("8", "Earth/Dirt", "", 8),
-            ("9", "Wooden Plank", "", 9),
-            ("A", "Packed Earth/Wood (struck: wooden sound)", "", 0xA),
-            ("B", "Earth/Dirt", "", 0xB),
-            ("C", "Ceramic", "", 0xC),
-            ("D", "Loose Earth/Dirt", "", 0xD),
-            # ('E','Earth/dirt','',0xE),
-            # ('F','Earth/dirt','',0xF),
-        )
-    )
+    slope: bpy.props.EnumProperty(items=polytype_enum_items_factory("slope"))
+    sound: bpy.props.EnumProperty(items=polytype_enum_items_factory("sound"))
 
 
 class ZELDA64_MaterialMeshCollisionProperties(bpy.types.PropertyGroup):
@@ -175,6 +288,111 @@ class ZELDA64_MaterialMeshCollisionProperties(bpy.types.PropertyGroup):
     enable_conveyor: bpy.props.BoolProperty()
 
 
+class MaterialSummary:
+    """What the reduced info panel and the overview list show of a material.
+
+    Computed once per material and cached in `material_summaries`, until a
+    collision property changes (see `subscribe_material_summaries`).
+    """
+
+    # todo camera? echo? lighting? shown even when 0
+    ALWAYS_SHOWN = ("camera", "echo", "lighting")
+    CONVEYOR_ATTRS = ("conveyor_direction", "conveyor_speed")
+    IGNORE_ATTRS = ("ignore_projectiles", "ignore_entities", "ignore_camera")
+
+    def __init__(self, material: bpy.types.Material):
+        props: ZELDA64_MaterialMeshCollisionProperties = (
+            material.z64_import_mesh_collision
+        )
+        self.is_import_material = props.is_import_material
+        self.polytype_attrs = list[str]()
+        self.ignore_attrs = list[str]()
+        self.enable_conveyor = False
+        self.label = ""
+        if not self.is_import_material:
+            return
+        polytype_props: ZELDA64_MaterialMeshCollisionPolytypeProperties = props.polytype
+        profile = GAME_PROFILES[polytype_props.game]
+        self.enable_conveyor = props.enable_conveyor
+        descriptions = list[str]()
+        for attr, word, shift, mask, kind in profile.polytype_fields:
+            value = getattr(polytype_props, attr)
+            if kind == "enum":
+                is_set = value != "0"
+                display = profile.polytype_enum_items[attr][int(value, 16)][1]
+            else:
+                is_set = bool(value)
+                display = value if kind == "int" else None
+            if is_set:
+                descriptions.append(attr if display is None else f"{attr}: {display}")
+            if (
+                is_set
+                or attr in self.ALWAYS_SHOWN
+                or (attr in self.CONVEYOR_ATTRS and self.enable_conveyor)
+            ):
+                self.polytype_attrs.append(attr)
+        for attr in self.IGNORE_ATTRS:
+            if getattr(props, attr):
+                self.ignore_attrs.append(attr)
+                descriptions.append(attr)
+        if self.enable_conveyor:
+            descriptions.append("enable_conveyor")
+        self.label = ", ".join(descriptions) if descriptions else "default"
+
+
+# Material.session_uid -> MaterialSummary
+material_summaries = dict[int, MaterialSummary]()
+
+
+def get_material_summary(material: bpy.types.Material):
+    summary = material_summaries.get(material.session_uid)
+    if summary is None:
+        summary = MaterialSummary(material)
+        material_summaries[material.session_uid] = summary
+    return summary
+
+
+def invalidate_material_summaries():
+    """Clear the cached material summaries.
+
+    Property changes from the UI or the Python API, undo and redo do this
+    automatically, call it after collision properties are changed by drivers or
+    animation.
+    """
+    material_summaries.clear()
+
+
+# owner of the msgbus subscriptions, for clearing them
+material_summaries_msgbus_owner = object()
+
+
+def subscribe_material_summaries():
+    for clazz in (
+        ZELDA64_MaterialMeshCollisionProperties,
+        ZELDA64_MaterialMeshCollisionPolytypeProperties,
+    ):
+        for attr in clazz.__annotations__:
+            bpy.msgbus.subscribe_rna(
+                key=(clazz, attr),
+                owner=material_summaries_msgbus_owner,
+                args=(),
+                notify=invalidate_material_summaries,
+            )
+
+
+@bpy.app.handlers.persistent
+def material_summaries_load_post(*args):
+    # subscriptions are cleared when loading a file
+    invalidate_material_summaries()
+    subscribe_material_summaries()
+
+
+@bpy.app.handlers.persistent
+def material_summaries_undo_redo_post(*args):
+    # undo and redo restore property values without msgbus notifications
+    invalidate_material_summaries()
+
+
 class ZELDA64_PT_material_mesh_collision(bpy.types.Panel):
     bl_label = "z64 import collision"
     bl_space_type = "PROPERTIES"
@@ -198,58 +416,22 @@ class ZELDA64_PT_material_mesh_collision(bpy.types.Panel):
         )
         self.layout.prop(global_props, "reduced_info")
         if global_props.reduced_info:
+            summary = get_material_summary(context.material)
             box = self.layout.box()
-            if polytype_props.no_horse:
-                box.prop(polytype_props, "no_horse")
-            if polytype_props.minus_one_unit:
-                box.prop(polytype_props, "minus_one_unit")
-            if polytype_props.floor != "0":
-                box.prop(polytype_props, "floor")
-            if polytype_props.wall != "0":
-                box.prop(polytype_props, "wall")
-            if polytype_props.special != "0":
-                box.prop(polytype_props, "special")
-            if polytype_props.exit:
-                box.prop(polytype_props, "exit")
-            # todo camera?
-            box.prop(polytype_props, "camera")
-            # polytype low word
-            if polytype_props.wall_damage:
-                box.prop(polytype_props, "wall_damage")
-            if polytype_props.conveyor_direction or props.enable_conveyor:
-                box.prop(polytype_props, "conveyor_direction")
-            if polytype_props.conveyor_speed != "0" or props.enable_conveyor:
-                box.prop(polytype_props, "conveyor_speed")
-            if polytype_props.hookshot:
-                box.prop(polytype_props, "hookshot")
-            # todo echo?
-            box.prop(polytype_props, "echo")
-            # todo lighting?
-            box.prop(polytype_props, "lighting")
-            if polytype_props.slope != "0":
-                box.prop(polytype_props, "slope")
-            if polytype_props.sound != "0":
-                box.prop(polytype_props, "sound")
+            for attr in summary.polytype_attrs:
+                box.prop(polytype_props, attr)
             # ignore flags
-            box = None
-            if props.ignore_projectiles:
-                if box is None:
-                    box = self.layout.box()
-                box.prop(props, "ignore_projectiles")
-            if props.ignore_entities:
-                if box is None:
-                    box = self.layout.box()
-                box.prop(props, "ignore_entities")
-            if props.ignore_camera:
-                if box is None:
-                    box = self.layout.box()
-                box.prop(props, "ignore_camera")
+            if summary.ignore_attrs:
+                box = self.layout.box()
+                for attr in summary.ignore_attrs:
+                    box.prop(props, attr)
             # conveyor
-            if props.enable_conveyor:
+            if summary.enable_conveyor:
                 self.layout.prop(props, "enable_conveyor")
         else:
             # polytype
             box = self.layout.box()
+            box.prop(polytype_props, "game")
             box.prop(props, "polytype_index")
             box.prop(props, "polytype_raw")
             # polytype high word
@@ -279,7 +461,69 @@ class ZELDA64_PT_material_mesh_collision(bpy.types.Panel):
             self.layout.prop(props, "enable_conveyor")
 
 
+class ZELDA64_UL_mesh_collision_materials(bpy.types.UIList):
+    def draw_item(
+        self, context, layout, data, item, icon, active_data, active_propname, index
+    ):
+        summary = get_material_summary(item)
+        row = layout.row()
+        row.label(text=item.name, icon_value=icon)
+        row.label(text=summary.label)
+
+    def filter_items(self, context, data, propname):
+        materials = getattr(data, propname)
+        if self.filter_name:
+            flt_flags = bpy.types.UI_UL_list.filter_items_by_name(
+                self.filter_name, self.bitflag_filter_item, materials, "name"
+            )
+        else:
+            flt_flags = [self.bitflag_filter_item] * len(materials)
+        for i, material in enumerate(materials):
+            if not get_material_summary(material).is_import_material:
+                flt_flags[i] = 0
+        return flt_flags, []
+
+
+class ZELDA64_PT_material_mesh_collision_overview(bpy.types.Panel):
+    bl_label = "Overview"
+    bl_space_type = "PROPERTIES"
+    bl_region_type = "WINDOW"
+    bl_context = "material"
+    bl_parent_id = "ZELDA64_PT_material_mesh_collision"
+    bl_options = {"DEFAULT_CLOSED"}
+
+    def draw(self, context):
+        global_props: ZELDA64_ImportMeshCollision_SceneProperties = (
+            context.scene.z64_import_mesh_collision
+        )
+        self.layout.template_list(
+            "ZELDA64_UL_mesh_collision_materials",
+            "",
+            bpy.data,
+            "materials",
+            global_props,
+            "overview_index",
+            rows=10,
+        )
+
+
 class MeshCollisionHeader:
+    __slots__ = (
+        "minx",
+        "miny",
+        "minz",
+        "maxx",
+        "maxy",
+        "maxz",
+        "vertex_array_length",
+        "vertex_array_segment_offset",
+        "polygon_array_length",
+        "polygon_array_segment_offset",
+        "polytypes_table_segment_offset",
+        "cameradata_segment_offset",
+        "waterbox_array_length",
+        "waterbox_array_segment_offset",
+    )
 
     def load(self, data: bytes, mesh_collision_header_offset: int):
         unpacked = struct.unpack_from(
@@ -303,6 +547,13 @@ class MeshCollisionHeader:
             self.waterbox_array_segment_offset,
         ) = unpacked
 
+    def bounds(self):
+        """(min, max) (x, y, z) bounds as arrays."""
+        return (
+            np.array((self.minx, self.miny, self.minz)),
+            np.array((self.maxx, self.maxy, self.maxz)),
+        )
+
     def sanity_check_segments(self, expected_segment, log):
         offsets = (
             (
@@ -336,7 +587,1889 @@ class MeshCollisionHeader:
                 )
 
 
+VERTEX_DTYPE = np.dtype((">i2", (3,)))
+POLYGON_DTYPE = np.dtype(
+    [
+        ("polytype_index", ">u2"),
+        ("vtx", ">u2", (3,)),
+        ("normal", ">i2", (3,)),
+        ("d", ">i2"),
+    ]
+)
+POLYTYPE_DTYPE = np.dtype((">u4", (2,)))
+
+# normals are stored as s16 fixed point with 1.0 = 0x7FFF
+NORMAL_ONE = 0x7FFF
+
+
+def read_array(data: bytes, offset: int, dtype: np.dtype, length: int):
+    """Read up to `length` elements of `dtype` at `offset`, without copying.
+
+    Returns the array (possibly shorter than `length` if data is truncated).
+    """
+    available = max(0, (len(data) - offset) // dtype.itemsize) if offset >= 0 else 0
+    return np.frombuffer(data, dtype, min(length, available), offset)
+
+
+class DecodedMeshCollision:
+    """Raw vertex/polygon/polytype arrays of a mesh collision, decoded in bulk."""
+
+    __slots__ = (
+        "truncated_vertices",
+        "truncated_polygons",
+        "truncated_polytypes",
+        "vertices",
+        "polygon_vertex_indices",
+        "polygon_ignore_flags",
+        "polygon_enable_conveyor",
+        "polygon_polytype_index",
+        "polygon_normals",
+        "polygon_d",
+        "polytypes",
+    )
+
+    def load(
+        self,
+        data: bytes,
+        mesh_collision_header: MeshCollisionHeader,
+        profile: GameProfile = GAME_PROFILES["OOT"],
+    ):
+        vertices = read_array(
+            data,
+            mesh_collision_header.vertex_array_segment_offset & 0xFFFFFF,
+            VERTEX_DTYPE,
+            mesh_collision_header.vertex_array_length,
+        )
+        polygons = read_array(
+            data,
+            mesh_collision_header.polygon_array_segment_offset & 0xFFFFFF,
+            POLYGON_DTYPE,
+            mesh_collision_header.polygon_array_length,
+        )
+        self.truncated_vertices = (
+            mesh_collision_header.vertex_array_length - vertices.shape[0]
+        )
+        self.truncated_polygons = (
+            mesh_collision_header.polygon_array_length - polygons.shape[0]
+        )
+        self.vertices = vertices.astype(np.int32)
+        (
+            self.polygon_vertex_indices,
+            self.polygon_ignore_flags,
+            self.polygon_enable_conveyor,
+        ) = profile.decode_polygon_vertex_words(polygons["vtx"].astype(np.int32))
+        self.polygon_polytype_index = polygons["polytype_index"].astype(np.int32)
+        self.polygon_normals = polygons["normal"].astype(np.int32)
+        self.polygon_d = polygons["d"].astype(np.int32)
+        polytypes_length = (
+            int(self.polygon_polytype_index.max()) + 1
+            if self.polygon_polytype_index.shape[0] != 0
+            else 0
+        )
+        polytypes = read_array(
+            data,
+            mesh_collision_header.polytypes_table_segment_offset & 0xFFFFFF,
+            POLYTYPE_DTYPE,
+            polytypes_length,
+        )
+        self.truncated_polytypes = polytypes_length - polytypes.shape[0]
+        self.polytypes = polytypes.astype(np.uint32)
+
+    def valid_polygons(self):
+        """Indices of the polygons with all their vertex indices in range."""
+        return np.flatnonzero(
+            (self.polygon_vertex_indices < self.vertices.shape[0]).all(axis=1)
+        )
+
+    def polygon_material_keys(self, polygons: np.ndarray | None = None):
+        """(n, 4) uint32 array of the (ignore_flags, enable_conveyor, polytype_hi,
+        polytype_lo) material key of each polygon (or of `polygons` only), see
+        `CollisionMaterials` and `material_key`."""
+        if polygons is None:
+            polygons = np.arange(self.polygon_vertex_indices.shape[0])
+        polygon_polytypes = self.polygon_polytypes()[polygons]
+        return np.stack(
+            (
+                self.polygon_ignore_flags[polygons],
+                self.polygon_enable_conveyor[polygons],
+                polygon_polytypes[:, 0],
+                polygon_polytypes[:, 1],
+            ),
+            axis=1,
+        ).astype(np.uint32)
+
+    def polygon_polytypes(self):
+        """(n, 2) array of the (hi, lo) polytype words used by each polygon.
+
+        Polygons using an out-of-range polytype index get (0, 0).
+        """
+        in_range = self.polygon_polytype_index < self.polytypes.shape[0]
+        polygon_polytypes = np.zeros(
+            (self.polygon_polytype_index.shape[0], 2), dtype=np.uint32
+        )
+        polygon_polytypes[in_range] = self.polytypes[
+            self.polygon_polytype_index[in_range]
+        ]
+        return polygon_polytypes
+
+
+def material_key(key: np.ndarray):
+    """The (ignore_flags, enable_conveyor, polytype_hi, polytype_lo) tuple of a row
+    of `DecodedMeshCollision.polygon_material_keys`."""
+    ignore_flags, enable_conveyor, polytype_hi, polytype_lo = key.tolist()
+    return (ignore_flags, bool(enable_conveyor), polytype_hi, polytype_lo)
+
+
+class MeshCollisionValidationReport:
+    """Result of `validate_mesh_collision`, see `to_dict` for a JSON-friendly view.
+
+    Index arrays hold polygon (or vertex) indices of each kind of issue.
+    """
+
+    # polygon normals are considered to disagree with the winding below this cosine
+    NORMAL_MIN_COSINE = 0.99
+    # d may be off by rounding in the original tools
+    D_TOLERANCE = 2
+
+    def to_dict(self):
+        return {
+            "vertex_count": self.vertex_count,
+            "polygon_count": self.polygon_count,
+            "polytype_count": self.polytype_count,
+            "truncated_vertices": self.truncated_vertices,
+            "truncated_polygons": self.truncated_polygons,
+            "truncated_polytypes": self.truncated_polytypes,
+            "bounds_header": self.bounds_header,
+            "bounds_vertices": self.bounds_vertices,
+            "vertices_out_of_bounds": self.vertices_out_of_bounds.tolist(),
+            "out_of_range_vertex_index": self.out_of_range_vertex_index.tolist(),
+            "degenerate": self.degenerate.tolist(),
+            "duplicate": self.duplicate.tolist(),
+            "bad_normal": self.bad_normal.tolist(),
+            "bad_d": self.bad_d.tolist(),
+        }
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.to_dict(), **kwargs)
+
+    def is_ok(self):
+        return not (
+            self.truncated_vertices
+            or self.truncated_polygons
+            or self.truncated_polytypes
+            or self.vertices_out_of_bounds.shape[0]
+            or self.out_of_range_vertex_index.shape[0]
+            or self.degenerate.shape[0]
+            or self.duplicate.shape[0]
+            or self.bad_normal.shape[0]
+            or self.bad_d.shape[0]
+        )
+
+    def log_summary(self, log):
+        for desc, count in (
+            ("truncated vertices", self.truncated_vertices),
+            ("truncated polygons", self.truncated_polygons),
+            ("truncated polytypes", self.truncated_polytypes),
+            ("vertices out of header bounds", self.vertices_out_of_bounds.shape[0]),
+            (
+                "polygons with out of range vertex indices",
+                self.out_of_range_vertex_index.shape[0],
+            ),
+            ("degenerate polygons", self.degenerate.shape[0]),
+            ("duplicate polygons", self.duplicate.shape[0]),
+            ("polygons with normal not matching winding", self.bad_normal.shape[0]),
+            ("polygons with wrong d", self.bad_d.shape[0]),
+        ):
+            if count:
+                log.warn(f"Validation: {count} {desc}")
+        if self.is_ok():
+            log.info("Validation: no issue found")
+
+
+def duplicate_polygons(vertex_indices: np.ndarray):
+    """Mask of the polygons using the same set of vertices as an earlier polygon,
+    regardless of order."""
+    sorted_indices = np.sort(vertex_indices, axis=1)
+    _, first_occurrence, inverse = np.unique(
+        sorted_indices, axis=0, return_index=True, return_inverse=True
+    )
+    inverse = inverse.reshape(-1)
+    return first_occurrence[inverse] != np.arange(vertex_indices.shape[0])
+
+
+def validate_mesh_collision(
+    mesh_collision_header: MeshCollisionHeader,
+    decoded: DecodedMeshCollision,
+):
+    """Check the decoded collision arrays for issues, without building any mesh."""
+    report = MeshCollisionValidationReport()
+    vertices = decoded.vertices
+    vertex_indices = decoded.polygon_vertex_indices
+    report.vertex_count = vertices.shape[0]
+    report.polygon_count = vertex_indices.shape[0]
+    report.polytype_count = decoded.polytypes.shape[0]
+    report.truncated_vertices = decoded.truncated_vertices
+    report.truncated_polygons = decoded.truncated_polygons
+    report.truncated_polytypes = decoded.truncated_polytypes
+    # bounds
+    header_min, header_max = mesh_collision_header.bounds()
+    report.bounds_header = (header_min.tolist(), header_max.tolist())
+    if vertices.shape[0] != 0:
+        report.bounds_vertices = (
+            vertices.min(axis=0).tolist(),
+            vertices.max(axis=0).tolist(),
+        )
+    else:
+        report.bounds_vertices = None
+    report.vertices_out_of_bounds = np.flatnonzero(
+        ((vertices < header_min) | (vertices > header_max)).any(axis=1)
+    )
+    # vertex indices
+    valid = decoded.valid_polygons()
+    out_of_range = np.ones(vertex_indices.shape[0], dtype=bool)
+    out_of_range[valid] = False
+    report.out_of_range_vertex_index = np.flatnonzero(out_of_range)
+    # compute the rest on polygons with valid indices only
+    valid_indices = vertex_indices[valid]
+    tris = vertices[valid_indices].astype(np.float64)
+    cross = np.cross(tris[:, 1] - tris[:, 0], tris[:, 2] - tris[:, 0])
+    cross_length = np.linalg.norm(cross, axis=1)
+    same_index = (
+        (valid_indices[:, 0] == valid_indices[:, 1])
+        | (valid_indices[:, 1] == valid_indices[:, 2])
+        | (valid_indices[:, 2] == valid_indices[:, 0])
+    )
+    degenerate = same_index | (cross_length == 0)
+    report.degenerate = valid[degenerate]
+    report.duplicate = np.flatnonzero(duplicate_polygons(vertex_indices))
+    # normals
+    normals = decoded.polygon_normals[valid] / NORMAL_ONE
+    normals_length = np.linalg.norm(normals, axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cosine = np.einsum("ij,ij->i", cross, normals) / (cross_length * normals_length)
+    bad_normal = ~degenerate & ~(cosine >= report.NORMAL_MIN_COSINE)
+    report.bad_normal = valid[bad_normal]
+    # d, as computed by the game: -(normal . first vertex)
+    expected_d = -np.einsum("ij,ij->i", normals, tris[:, 0])
+    bad_d = np.abs(np.rint(expected_d) - decoded.polygon_d[valid]) > report.D_TOLERANCE
+    report.bad_d = valid[bad_d]
+    return report
+
+
+# xpFlags / polygon ignore flags, as in the decomp's z_bgcheck.c
+COLPOLY_IGNORE_CAMERA = 1 << 0
+COLPOLY_IGNORE_ENTITY = 1 << 1
+COLPOLY_IGNORE_PROJECTILES = 1 << 2
+
+BGCHECK_Y_MIN = -32000.0
+
+# polygon classification thresholds on the normal y component, see StaticLookup_AddPoly
+COLPOLY_FLOOR_MIN_NORMAL_Y = 0.5
+COLPOLY_CEILING_MAX_NORMAL_Y = -0.8
+
+
+class XZGrid:
+    """Uniform grid over the XZ plane, binning polygons by their XZ bounding box.
+
+    Used as a broad phase for batched queries, similarly to the game's subdivisions.
+    """
+
+    # cap on the grid size along each axis
+    MAX_CELLS = 512
+
+    def __init__(self, mins: np.ndarray, maxs: np.ndarray, margin: float = 0):
+        """`mins`/`maxs` are the (n, 2) XZ bounding boxes of the polygons to bin."""
+        mins = mins - margin
+        maxs = maxs + margin
+        if mins.shape[0] != 0:
+            self.origin = mins.min(axis=0)
+            extent = maxs.max(axis=0) - self.origin
+            median_size = np.median(maxs - mins, axis=0).max()
+            self.cell_size = max(
+                float(median_size), float(extent.max()) / self.MAX_CELLS, 1.0
+            )
+        else:
+            self.origin = np.zeros(2)
+            self.cell_size = 1.0
+        cell_mins = np.floor((mins - self.origin) / self.cell_size).astype(np.int64)
+        cell_maxs = np.floor((maxs - self.origin) / self.cell_size).astype(np.int64)
+        self.shape = (
+            cell_maxs.max(axis=0) + 1 if mins.shape[0] != 0 else np.ones(2, np.int64)
+        )
+        # enumerate the (cell, polygon) pairs covered by each polygon's bounding box
+        widths = cell_maxs[:, 0] - cell_mins[:, 0] + 1
+        counts = widths * (cell_maxs[:, 1] - cell_mins[:, 1] + 1)
+        polygon_ids = np.repeat(np.arange(mins.shape[0]), counts)
+        local = np.arange(polygon_ids.shape[0]) - np.repeat(
+            np.cumsum(counts) - counts, counts
+        )
+        widths = np.repeat(widths, counts)
+        cell_x = np.repeat(cell_mins[:, 0], counts) + local % widths
+        cell_z = np.repeat(cell_mins[:, 1], counts) + local // widths
+        cells = cell_x * self.shape[1] + cell_z
+        order = np.argsort(cells, kind="stable")
+        self.polygon_ids = polygon_ids[order]
+        self.cell_starts = np.searchsorted(
+            cells[order], np.arange(self.shape[0] * self.shape[1] + 1)
+        )
+
+    def candidates(self, xz: np.ndarray):
+        """Return (point indices, polygon indices) pairs to test for the (n, 2) points `xz`.
+
+        Pairs are grouped by point, in increasing polygon index for each point.
+        """
+        cell = np.floor((xz - self.origin) / self.cell_size).astype(np.int64)
+        inside = ((cell >= 0) & (cell < self.shape)).all(axis=1)
+        cell_index = np.where(inside, cell[:, 0] * self.shape[1] + cell[:, 1], 0)
+        starts = self.cell_starts[cell_index]
+        counts = np.where(inside, self.cell_starts[cell_index + 1] - starts, 0)
+        point_ids = np.repeat(np.arange(xz.shape[0]), counts)
+        local = np.arange(point_ids.shape[0]) - np.repeat(
+            np.cumsum(counts) - counts, counts
+        )
+        return point_ids, self.polygon_ids[np.repeat(starts, counts) + local]
+
+
+def last_in_groups(groups: np.ndarray, keys: np.ndarray):
+    """Return the indices of the element with the largest key for each group value."""
+    order = np.lexsort((keys, groups))
+    sorted_groups = groups[order]
+    is_last = np.ones(order.shape[0], dtype=bool)
+    is_last[:-1] = sorted_groups[1:] != sorted_groups[:-1]
+    return order[is_last]
+
+
+class CollisionProbe:
+    """Floor and wall queries against decoded collision, following the decomp's bgcheck.
+
+    All queries are batched: points are (n, 3) arrays in game coordinates.
+    """
+
+    def __init__(self, decoded: DecodedMeshCollision):
+        valid = decoded.valid_polygons()
+        self.polygon_indices = valid
+        self.tris = decoded.vertices[decoded.polygon_vertex_indices[valid]].astype(
+            np.float64
+        )
+        self.normals = decoded.polygon_normals[valid] / NORMAL_ONE
+        self.d = decoded.polygon_d[valid].astype(np.float64)
+        self.ignore_flags = decoded.polygon_ignore_flags[valid]
+        normal_y = self.normals[:, 1]
+        self.is_floor = normal_y > COLPOLY_FLOOR_MIN_NORMAL_Y
+        self.is_ceiling = normal_y < COLPOLY_CEILING_MAX_NORMAL_Y
+        self.is_wall = ~self.is_floor & ~self.is_ceiling
+        self._floor_grid = None
+        self._floor_grid_margin = None
+        self._wall_grid = None
+        self._wall_grid_margin = None
+
+    def _polygon_xz_bounds(self, polygons: np.ndarray):
+        tris_xz = self.tris[polygons][:, :, (0, 2)]
+        return tris_xz.min(axis=1), tris_xz.max(axis=1)
+
+    def floor_grid(self, margin: float):
+        if self._floor_grid is None or self._floor_grid_margin < margin:
+            self._floor_ids = np.flatnonzero(self.is_floor)
+            self._floor_grid = XZGrid(
+                *self._polygon_xz_bounds(self._floor_ids), margin=margin
+            )
+            self._floor_grid_margin = margin
+            self._floor_edge_functions = xz_edge_functions(self.tris[self._floor_ids])
+        return self._floor_ids, self._floor_grid
+
+    def wall_grid(self, margin: float):
+        if self._wall_grid is None or self._wall_grid_margin < margin:
+            self._wall_ids = np.flatnonzero(self.is_wall)
+            self._wall_grid = XZGrid(
+                *self._polygon_xz_bounds(self._wall_ids), margin=margin
+            )
+            self._wall_grid_margin = margin
+        return self._wall_ids, self._wall_grid
+
+    def floor_heights(
+        self,
+        points: np.ndarray,
+        xp_flags: int = COLPOLY_IGNORE_ENTITY,
+        check_dist: float = 1.0,
+        chunk_size: int = 0x10000,
+    ):
+        """Find the floor below each point, like BgCheck_RaycastDown.
+
+        The floor of a point is the highest floor polygon below it whose XZ projection
+        contains the point (within `check_dist`), ignoring polygons with any of the
+        ignore flags in `xp_flags` set.
+
+        Returns (heights, polygon indices), heights are BGCHECK_Y_MIN and polygon
+        indices -1 where there is no floor.
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        heights = np.full(points.shape[0], BGCHECK_Y_MIN)
+        polygons = np.full(points.shape[0], -1, dtype=np.int64)
+        floor_ids, grid = self.floor_grid(check_dist)
+        for start in range(0, points.shape[0], chunk_size):
+            chunk = points[start : start + chunk_size]
+            point_ids, local_candidates = grid.candidates(chunk[:, (0, 2)])
+            keep = (self.ignore_flags[floor_ids[local_candidates]] & xp_flags) == 0
+            point_ids = point_ids[keep]
+            local_candidates = local_candidates[keep]
+            edge_functions = self._floor_edge_functions[local_candidates]
+            p = chunk[point_ids]
+            inside = (
+                edge_functions[:, :, 0] * p[:, 0:1]
+                + edge_functions[:, :, 1] * p[:, 2:3]
+                + edge_functions[:, :, 2]
+                >= -check_dist
+            ).all(axis=1)
+            point_ids = point_ids[inside]
+            candidates = floor_ids[local_candidates[inside]]
+            n = self.normals[candidates]
+            p = chunk[point_ids]
+            intersect = (
+                -(n[:, 0] * p[:, 0] + n[:, 2] * p[:, 2] + self.d[candidates]) / n[:, 1]
+            )
+            below = intersect < p[:, 1]
+            point_ids = point_ids[below]
+            candidates = candidates[below]
+            intersect = intersect[below]
+            best = last_in_groups(point_ids, intersect)
+            heights[start + point_ids[best]] = intersect[best]
+            polygons[start + point_ids[best]] = self.polygon_indices[candidates[best]]
+        return heights, polygons
+
+    def wall_push(
+        self,
+        points: np.ndarray,
+        radius: float,
+        check_height: float = 0,
+        xp_flags: int = COLPOLY_IGNORE_ENTITY,
+        chunk_size: int = 0x10000,
+    ):
+        """Push spheres out of walls, like BgCheck_CheckWallImpl.
+
+        Each point is checked at `check_height` above it with the given `radius`.
+        Walls are applied one after the other in polygon order, each one using the
+        position as displaced by the previous ones, as in the game.
+
+        Returns (pushed points, polygon indices of the last wall hit or -1).
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        result = points.copy()
+        polygons = np.full(points.shape[0], -1, dtype=np.int64)
+        wall_ids, grid = self.wall_grid(radius)
+        for start in range(0, points.shape[0], chunk_size):
+            chunk = result[start : start + chunk_size]
+            point_ids, candidates = grid.candidates(chunk[:, (0, 2)])
+            candidates = wall_ids[candidates]
+            keep = (self.ignore_flags[candidates] & xp_flags) == 0
+            point_ids = point_ids[keep]
+            candidates = candidates[keep]
+            # rank of each candidate among the candidates of the same point
+            group_starts = np.searchsorted(point_ids, point_ids)
+            ranks = np.arange(point_ids.shape[0]) - group_starts
+            for rank in range(int(ranks.max()) + 1 if ranks.shape[0] != 0 else 0):
+                selected = ranks == rank
+                pids = point_ids[selected]
+                cids = candidates[selected]
+                p = chunk[pids]
+                p[:, 1] += check_height
+                n = self.normals[cids]
+                normal_xz = np.hypot(n[:, 0], n[:, 2])
+                plane_dist = np.einsum("ij,ij->i", n, p) + self.d[cids]
+                # walls the sphere is touching and not (too far) behind
+                touching = (np.abs(plane_dist) <= radius) & (plane_dist >= -4.0)
+                # project horizontally onto the wall plane
+                projected = p.copy()
+                projected[:, (0, 2)] -= (
+                    n[:, (0, 2)] * (plane_dist / normal_xz**2)[:, np.newaxis]
+                )
+                hit = touching & tris_contain(self.tris[cids], n, projected, 1.0)
+                pids = pids[hit]
+                displacement = (radius - plane_dist[hit]) / normal_xz[hit]
+                chunk[pids, 0] += displacement * n[hit, 0]
+                chunk[pids, 2] += displacement * n[hit, 2]
+                polygons[start + pids] = self.polygon_indices[cids[hit]]
+        return result, polygons
+
+
+def xz_edge_functions(tris: np.ndarray):
+    """(n, 3, 3) coefficients (a, b, c) of the edges of each (3, 3) triangle's XZ
+    projection, such that a * x + b * z + c is the signed distance of (x, z) to the
+    edge, positive inside. Degenerate projections are outside of every point."""
+    a = tris[:, :, (0, 2)]
+    edges = np.roll(a, -1, axis=1) - a
+    area = edges[:, 0, 1] * -edges[:, 2, 0] - edges[:, 0, 0] * -edges[:, 2, 1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        w = np.sign(area)[:, np.newaxis] / np.linalg.norm(edges, axis=2)
+    edge_functions = np.stack(
+        (
+            edges[:, :, 1] * w,
+            -edges[:, :, 0] * w,
+            (edges[:, :, 0] * a[:, :, 1] - edges[:, :, 1] * a[:, :, 0]) * w,
+        ),
+        axis=2,
+    )
+    edge_functions[area == 0] = (0, 0, -np.inf)
+    return edge_functions
+
+
+def tris_contain(
+    tris: np.ndarray, normals: np.ndarray, points: np.ndarray, tolerance: float
+):
+    """For each (3, 3) triangle, normal and point in its plane, check if the point is
+    inside the triangle, allowing `tolerance` units outside of the edges."""
+    edges = np.roll(tris, -1, axis=1) - tris
+    to_point = points[:, np.newaxis, :] - tris
+    edge_functions = np.einsum("ijk,ik->ij", np.cross(edges, to_point), normals)
+    winding = np.sign(
+        np.einsum("ij,ij->i", np.cross(edges[:, 0], -edges[:, 2]), normals)
+    )
+    edge_functions *= winding[:, np.newaxis]
+    return (edge_functions >= -tolerance * np.linalg.norm(edges, axis=2)).all(
+        axis=1
+    ) & (winding != 0)
+
+
+FLOOR_COVERAGE_FLOOR = 0
+FLOOR_COVERAGE_NO_FLOOR = 1
+FLOOR_COVERAGE_VOID = 2
+
+
+def floor_coverage(
+    mesh_collision_header: MeshCollisionHeader,
+    decoded: DecodedMeshCollision,
+    cell_size: float,
+    profile: GameProfile = GAME_PROFILES["OOT"],
+    xp_flags: int = COLPOLY_IGNORE_ENTITY,
+    chunk_size: int = 0x40000,
+    max_workers: int | None = None,
+):
+    """Cast vertical rays down from above the header bounds, on a XZ grid of `cell_size`.
+
+    Chunks of rays are processed in parallel threads.
+
+    Returns (origin xz, coverage, heights) where coverage and heights are (nx, nz)
+    arrays, coverage holding one of the FLOOR_COVERAGE_* values for each cell.
+    """
+    probe = CollisionProbe(decoded)
+    check_dist = 1.0
+    # build the broad phase once, before sharing the probe between threads
+    probe.floor_grid(check_dist)
+    header_min, header_max = mesh_collision_header.bounds()
+    origin = header_min[[0, 2]].astype(np.float64)
+    end = header_max[[0, 2]].astype(np.float64)
+    shape = np.maximum(np.ceil((end - origin) / cell_size).astype(np.int64), 1)
+    cell_count = int(shape[0] * shape[1])
+    ray_y = mesh_collision_header.maxy + 1.0
+    floor_types = profile.decode_polytypes(decoded.polygon_polytypes())["floor"]
+
+    def process_chunk(start):
+        cells = np.arange(start, min(start + chunk_size, cell_count))
+        points = np.empty((cells.shape[0], 3))
+        # sample the center of each cell
+        points[:, 0] = origin[0] + (cells // shape[1] + 0.5) * cell_size
+        points[:, 1] = ray_y
+        points[:, 2] = origin[1] + (cells % shape[1] + 0.5) * cell_size
+        return probe.floor_heights(points, xp_flags=xp_flags, check_dist=check_dist)
+
+    heights = np.empty(cell_count)
+    polygons = np.empty(cell_count, dtype=np.int64)
+    starts = range(0, cell_count, chunk_size)
+    with concurrent.futures.ThreadPoolExecutor(max_workers) as executor:
+        for start, (chunk_heights, chunk_polygons) in zip(
+            starts, executor.map(process_chunk, starts)
+        ):
+            heights[start : start + chunk_size] = chunk_heights
+            polygons[start : start + chunk_size] = chunk_polygons
+    coverage = np.full(cell_count, FLOOR_COVERAGE_FLOOR, dtype=np.uint8)
+    coverage[polygons < 0] = FLOOR_COVERAGE_NO_FLOOR
+    # only look up the floor type of cells that hit a polygon, there may be none
+    hit = np.flatnonzero(polygons >= 0)
+    coverage[hit[np.isin(floor_types[polygons[hit]], profile.void_floor_types)]] = (
+        FLOOR_COVERAGE_VOID
+    )
+    return origin, coverage.reshape(shape), heights.reshape(shape)
+
+
+def floor_coverage_pixels(coverage: np.ndarray, heights: np.ndarray):
+    """RGBA heatmap of a floor coverage, as an (nz, nx, 4) float array.
+
+    Floors are shaded by height, cells without floor are red and void floors magenta.
+    Rows go from +z to -z so that the image is seen from above with -z up.
+    """
+    pixels = np.ones(coverage.shape + (4,), dtype=np.float32)
+    has_floor = coverage == FLOOR_COVERAGE_FLOOR
+    if has_floor.any():
+        floor_heights = heights[has_floor]
+        low, high = floor_heights.min(), floor_heights.max()
+        shade = (floor_heights - low) / max(high - low, 1) * 0.8 + 0.2
+        pixels[has_floor, 0] = shade * 0.5
+        pixels[has_floor, 1] = shade
+        pixels[has_floor, 2] = shade * 0.5
+    pixels[coverage == FLOOR_COVERAGE_NO_FLOOR, :3] = (1, 0, 0)
+    pixels[coverage == FLOOR_COVERAGE_VOID, :3] = (1, 0, 1)
+    # (nx, nz) -> (nz, nx) rows, with first row (image bottom) at +z
+    return pixels.transpose(1, 0, 2)[::-1]
+
+
+MESH_COLLISION_HEADER_SIZE = 0x2C
+# vertex indices in polygons are 13 bits
+MAX_VERTEX_COUNT = 0x2000
+
+
+class MeshCollisionHeaderCandidate:
+    """A possible mesh collision header found by `scan_mesh_collision_headers`."""
+
+    __slots__ = ("offset", "segment", "mesh_collision_header", "confidence")
+
+    def __init__(
+        self,
+        offset: int,
+        segment: int,
+        mesh_collision_header: MeshCollisionHeader,
+        confidence: float,
+    ):
+        self.offset = offset
+        self.segment = segment
+        self.mesh_collision_header = mesh_collision_header
+        self.confidence = confidence
+
+    def __repr__(self):
+        return (
+            f"MeshCollisionHeaderCandidate(offset=0x{self.offset:X}, "
+            f"segment=0x{self.segment:02X}, confidence={self.confidence:.2f})"
+        )
+
+
+def scan_mesh_collision_headers(
+    data,
+    expected_segment: int | None = None,
+    file_relative: bool = True,
+    chunk_size: int = 0x400000,
+):
+    """Find the likely mesh collision headers in `data`, in a single pass.
+
+    `data` may be bytes or a uint8 array such as a `np.memmap`, which is then read
+    one chunk at a time.
+    Headers are looked for at every 4-aligned offset, keeping those with non-zero
+    counts, zero padding, ordered bounds, (expected) segment bytes and non
+    overlapping arrays.
+
+    If `file_relative` is set, segment offsets must point inside `data` and the
+    arrays are decoded to compute a confidence score. Otherwise (for example
+    scanning a whole ROM, where segment offsets are relative to the unknown start
+    of the file containing the header) the confidence score only uses the header
+    itself, see `mesh_collision_header_layout_confidence`.
+
+    Returns candidates sorted by decreasing confidence.
+    """
+    buffer = np.frombuffer(data, dtype=np.uint8)
+    size = buffer.shape[0]
+    header_words = MESH_COLLISION_HEADER_SIZE // 4
+    chunk_size -= chunk_size % 4
+    offsets = []
+    for start in range(0, size - MESH_COLLISION_HEADER_SIZE + 1, chunk_size):
+        # overlap the next chunk by a header, to see headers crossing chunks
+        end = min(start + chunk_size + MESH_COLLISION_HEADER_SIZE - 4, size)
+        end -= (end - start) % 4
+        words = buffer[start:end].view(">u4")
+        count = min(words.shape[0] - header_words + 1, chunk_size // 4)
+        (
+            min_xy,
+            min_z_max_x,
+            max_yz,
+            vertex_count,
+            vertex_array,
+            polygon_count,
+            polygon_array,
+            polytypes_table,
+            cameradata,
+            waterbox_count,
+            waterbox_array,
+        ) = (words[i : i + count] for i in range(header_words))
+        # cheap filter first, on all offsets
+        mask = (
+            ((vertex_count & 0xFFFF) == 0)
+            & ((polygon_count & 0xFFFF) == 0)
+            & ((waterbox_count & 0xFFFF) == 0)
+            & (vertex_count != 0)
+            & (polygon_count != 0)
+            & ((vertex_count >> 16) <= MAX_VERTEX_COUNT)
+        )
+        segment = vertex_array >> 24
+        if expected_segment is not None:
+            mask &= segment == expected_segment
+        else:
+            mask &= (segment != 0) & (segment < 0x10)
+        mask &= (polygon_array >> 24 == segment) & (polytypes_table >> 24 == segment)
+        indices = np.flatnonzero(mask)
+        if indices.shape[0] == 0:
+            continue
+        # finer checks, on the remaining offsets only
+        segment = segment[indices]
+        bounds = (
+            np.stack((min_xy[indices], min_z_max_x[indices], max_yz[indices]), axis=1)
+            .astype(">u4")
+            .view(">i2")
+            .astype(np.int32)
+        )
+        mask = (bounds[:, :3] <= bounds[:, 3:]).all(axis=1)
+        cameradata_segment = cameradata[indices] >> 24
+        mask &= (cameradata_segment == 0) | (cameradata_segment == segment)
+        waterbox_segment = waterbox_array[indices] >> 24
+        mask &= (waterbox_count[indices] == 0) | (waterbox_segment == segment)
+        vertex_start = vertex_array[indices] & 0xFFFFFF
+        vertex_end = vertex_start + (vertex_count[indices] >> 16) * 6
+        polygon_start = polygon_array[indices] & 0xFFFFFF
+        polygon_end = polygon_start + (polygon_count[indices] >> 16) * 16
+        polytypes_start = polytypes_table[indices] & 0xFFFFFF
+        mask &= (vertex_end <= polygon_start) | (polygon_end <= vertex_start)
+        mask &= (polytypes_start < vertex_start) | (polytypes_start >= vertex_end)
+        mask &= (polytypes_start < polygon_start) | (polytypes_start >= polygon_end)
+        if file_relative:
+            mask &= (vertex_end <= size) & (polygon_end <= size)
+            mask &= polytypes_start + 8 <= size
+        offsets.extend((start + indices[mask] * 4).tolist())
+    candidates = []
+    for offset in offsets:
+        mesh_collision_header = MeshCollisionHeader()
+        mesh_collision_header.load(buffer, offset)
+        segment = mesh_collision_header.vertex_array_segment_offset >> 24
+        if file_relative:
+            decoded = DecodedMeshCollision()
+            decoded.load(buffer, mesh_collision_header)
+            confidence = mesh_collision_header_confidence(
+                mesh_collision_header, decoded
+            )
+        else:
+            confidence = mesh_collision_header_layout_confidence(mesh_collision_header)
+        candidates.append(
+            MeshCollisionHeaderCandidate(
+                offset, segment, mesh_collision_header, confidence
+            )
+        )
+    candidates.sort(key=lambda candidate: candidate.confidence, reverse=True)
+    return candidates
+
+
+def mesh_collision_header_confidence(
+    mesh_collision_header: MeshCollisionHeader,
+    decoded: DecodedMeshCollision,
+):
+    """Score from 0 to 1 of how much decoded arrays look like actual collision."""
+    vertex_indices = decoded.polygon_vertex_indices
+    if vertex_indices.shape[0] == 0 or decoded.vertices.shape[0] == 0:
+        return 0.0
+    in_range = decoded.valid_polygons().shape[0] / vertex_indices.shape[0]
+    normal_length = np.linalg.norm(decoded.polygon_normals, axis=1) / NORMAL_ONE
+    unit_normals = ((normal_length > 0.95) & (normal_length < 1.05)).mean()
+    header_min, header_max = mesh_collision_header.bounds()
+    in_bounds = (
+        ((decoded.vertices >= header_min) & (decoded.vertices <= header_max))
+        .all(axis=1)
+        .mean()
+    )
+    polytypes_ok = 1.0 if decoded.truncated_polytypes == 0 else 0.0
+    return float((in_range + unit_normals + in_bounds + polytypes_ok) / 4)
+
+
+def mesh_collision_header_layout_confidence(mesh_collision_header: MeshCollisionHeader):
+    """Score from 0 to 1 of how much a header alone looks like actual collision,
+    for when its arrays can't be located.
+
+    Checks a plausible polygon/vertex count ratio, bounds with an area, vertex and
+    polygon arrays next to each other, and the polytypes table shortly before them
+    (as laid out in the games' files).
+    """
+    vertex_count = mesh_collision_header.vertex_array_length
+    polygon_count = mesh_collision_header.polygon_array_length
+    ratio_ok = 0.5 <= polygon_count / max(vertex_count, 1) <= 4
+    bounds_ok = (
+        mesh_collision_header.maxx > mesh_collision_header.minx
+        and mesh_collision_header.maxz > mesh_collision_header.minz
+    )
+    vertex_start = mesh_collision_header.vertex_array_segment_offset & 0xFFFFFF
+    vertex_end = vertex_start + vertex_count * 6
+    polygon_start = mesh_collision_header.polygon_array_segment_offset & 0xFFFFFF
+    polygon_end = polygon_start + polygon_count * 16
+    # arrays may be padded to 8 or 16 bytes
+    arrays_adjacent = (
+        0 <= polygon_start - vertex_end < 0x10 or 0 <= vertex_start - polygon_end < 0x10
+    )
+    polytypes_start = mesh_collision_header.polytypes_table_segment_offset & 0xFFFFFF
+    arrays_start = min(vertex_start, polygon_start)
+    # there are at most as many polytypes as polygons, and maybe camera data after them
+    polytypes_before = (
+        polytypes_start < arrays_start
+        and arrays_start - polytypes_start <= polygon_count * 8 + 0x1000
+    )
+    return (ratio_ok + bounds_ok + arrays_adjacent + polytypes_before) / 4
+
+
+def find_mesh_collision_headers_file(filepath: str, **kwargs):
+    """`scan_mesh_collision_headers` on a file, memory-mapped instead of read."""
+    if os.path.getsize(filepath) < MESH_COLLISION_HEADER_SIZE:
+        return []
+    return scan_mesh_collision_headers(np.memmap(filepath, mode="r"), **kwargs)
+
+
+DIFF_REMOVED = 0
+DIFF_ADDED = 1
+DIFF_MOVED = 2
+DIFF_CHANGED_POLYTYPE = 3
+
+
+def row_keys(rows: np.ndarray):
+    """View each row of a 2D array as a single hashable/sortable void scalar."""
+    rows = np.ascontiguousarray(rows)
+    return rows.view(np.dtype((np.void, rows.dtype.itemsize * rows.shape[1]))).ravel()
+
+
+def occurrence_ranks(ids: np.ndarray):
+    """For each element, how many elements with the same id come before it."""
+    order = np.argsort(ids, kind="stable")
+    sorted_ids = ids[order]
+    ranks = np.empty(ids.shape[0], dtype=np.int64)
+    ranks[order] = np.arange(ids.shape[0]) - np.searchsorted(sorted_ids, sorted_ids)
+    return ranks
+
+
+def match_keys(keys_a: np.ndarray, keys_b: np.ndarray):
+    """For each key of `keys_a`, the index of a same key in `keys_b`, or -1.
+
+    Matches are one-to-one: the k-th occurrence of a key in `keys_a` goes with
+    the k-th occurrence of that key in `keys_b`, if any.
+    """
+    if keys_b.shape[0] == 0:
+        return np.full(keys_a.shape[0], -1, dtype=np.int64)
+    _, inverse = np.unique(np.concatenate((keys_a, keys_b)), return_inverse=True)
+    inverse = inverse.reshape(-1).astype(np.int64)
+    ids_a = inverse[: keys_a.shape[0]]
+    ids_b = inverse[keys_a.shape[0] :]
+    # (id, occurrence rank) as a single integer
+    count = inverse.shape[0]
+    occurrences_a = ids_a * count + occurrence_ranks(ids_a)
+    occurrences_b = ids_b * count + occurrence_ranks(ids_b)
+    order_b = np.argsort(occurrences_b)
+    found = np.minimum(
+        np.searchsorted(occurrences_b[order_b], occurrences_a), order_b.shape[0] - 1
+    )
+    return np.where(occurrences_b[order_b[found]] == occurrences_a, order_b[found], -1)
+
+
+class DecodedPolygonKeys:
+    """Per-polygon keys of decoded collision used for diffing."""
+
+    def __init__(self, decoded: DecodedMeshCollision):
+        self.valid = decoded.valid_polygons()
+        tris = decoded.vertices[decoded.polygon_vertex_indices[self.valid]]
+        # sort the vertices of each polygon, to match regardless of winding start
+        order = np.lexsort((tris[:, :, 2], tris[:, :, 1], tris[:, :, 0]), axis=1)
+        tris = np.take_along_axis(tris, order[:, :, np.newaxis], axis=1)
+        self.position = row_keys(tris.reshape(-1, 9).astype(np.int32))
+        # same shape and material anywhere, for moved polygons
+        self.material = decoded.polygon_material_keys(self.valid)
+        relative = (tris - tris[:, :1]).reshape(-1, 9).astype(np.int32)
+        self.shape = row_keys(
+            np.concatenate((relative, self.material.view(np.int32)), axis=1)
+        )
+
+
+class MeshCollisionDiff:
+    """Result of `diff_mesh_collisions`, polygon indices are into the decoded arrays.
+
+    - removed: polygons of A without a match in B
+    - added: polygons of B without a match in A
+    - moved: (A, B) pairs of polygons with the same shape and material, translated
+    - changed_polytype: (A, B) pairs of polygons at the same position with a
+      different material (polytype, ignore flags or conveyor flag)
+    """
+
+    def to_dict(self):
+        return {
+            "removed": self.removed.tolist(),
+            "added": self.added.tolist(),
+            "moved": self.moved.tolist(),
+            "changed_polytype": self.changed_polytype.tolist(),
+        }
+
+    def log_summary(self, log):
+        log.info(
+            f"Diff: {self.removed.shape[0]} removed, {self.added.shape[0]} added, "
+            f"{self.moved.shape[0]} moved, {self.changed_polytype.shape[0]} with a changed polytype"
+        )
+
+
+def diff_mesh_collisions(
+    decoded_a: DecodedMeshCollision, decoded_b: DecodedMeshCollision
+):
+    """Match the polygons of two collisions by vertex positions and compare them.
+
+    Polygons with out of range vertex indices are left out.
+    """
+    keys_a = DecodedPolygonKeys(decoded_a)
+    keys_b = DecodedPolygonKeys(decoded_b)
+    diff = MeshCollisionDiff()
+    # same position
+    match_a = match_keys(keys_a.position, keys_b.position)
+    matched_a = np.flatnonzero(match_a >= 0)
+    matched_b = match_a[matched_a]
+    changed = (keys_a.material[matched_a] != keys_b.material[matched_b]).any(axis=1)
+    diff.changed_polytype = np.stack(
+        (keys_a.valid[matched_a[changed]], keys_b.valid[matched_b[changed]]), axis=1
+    )
+    # same shape and material elsewhere
+    unmatched_a = np.flatnonzero(match_a < 0)
+    is_matched_b = np.zeros(keys_b.valid.shape[0], dtype=bool)
+    is_matched_b[matched_b] = True
+    unmatched_b = np.flatnonzero(~is_matched_b)
+    match_moved = match_keys(keys_a.shape[unmatched_a], keys_b.shape[unmatched_b])
+    moved = match_moved >= 0
+    diff.moved = np.stack(
+        (
+            keys_a.valid[unmatched_a[moved]],
+            keys_b.valid[unmatched_b[match_moved[moved]]],
+        ),
+        axis=1,
+    )
+    diff.removed = keys_a.valid[unmatched_a[~moved]]
+    is_moved_b = np.zeros(unmatched_b.shape[0], dtype=bool)
+    is_moved_b[match_moved[moved]] = True
+    diff.added = keys_b.valid[unmatched_b[~is_moved_b]]
+    return diff
+
+
+def connected_components(count: int, pairs_a: np.ndarray, pairs_b: np.ndarray):
+    """Label `count` nodes by connected component, given edges (pairs_a[i], pairs_b[i]).
+
+    Vectorized union-find: hook roots to the smallest root, then pointer jumping.
+    """
+    labels = np.arange(count)
+    while True:
+        labels_a = labels[pairs_a]
+        labels_b = labels[pairs_b]
+        different = labels_a != labels_b
+        if not different.any():
+            return labels
+        labels_a = labels_a[different]
+        labels_b = labels_b[different]
+        np.minimum.at(
+            labels, np.maximum(labels_a, labels_b), np.minimum(labels_a, labels_b)
+        )
+        while True:
+            jumped = labels[labels]
+            if (jumped == labels).all():
+                break
+            labels = jumped
+
+
+class CoplanarPatches:
+    """Connected patches of coplanar triangles with the same material, see `find_coplanar_patches`.
+
+    - triangle_patches: patch index of each triangle
+    - triangle_counts: triangle count of each patch
+    - hole_counts: hole count of each patch
+    - merged_triangle_counts: triangle count of each patch once merged and
+      retriangulated without interior vertices (b + 2 h - 2 for a patch with b
+      boundary vertices and h holes)
+    """
+
+    def projected_triangle_count(self):
+        return int(self.merged_triangle_counts.sum())
+
+
+def find_coplanar_patches(
+    vertices: np.ndarray,
+    triangles: np.ndarray,
+    material_ids: np.ndarray,
+    normal_tolerance: float = 1e-3,
+    distance_tolerance: float = 0.5,
+):
+    """Group (m, 3) triangles into connected patches of coplanar triangles with the
+    same material id, sharing edges.
+
+    Planes are clustered by rounding the unit normal to `normal_tolerance` and the
+    distance to origin to `distance_tolerance`.
+    """
+    triangle_count = triangles.shape[0]
+    tris = vertices[triangles].astype(np.float64)
+    normals = np.cross(tris[:, 1] - tris[:, 0], tris[:, 2] - tris[:, 0])
+    normals_length = np.linalg.norm(normals, axis=1)
+    degenerate = normals_length == 0
+    normals[~degenerate] /= normals_length[~degenerate, np.newaxis]
+    distances = -np.einsum("ij,ij->i", normals, tris[:, 0])
+    planes = np.concatenate(
+        (
+            np.rint(normals / normal_tolerance),
+            np.rint(distances / distance_tolerance)[:, np.newaxis],
+            material_ids[:, np.newaxis],
+        ),
+        axis=1,
+    ).astype(np.int64)
+    _, clusters = np.unique(row_keys(planes), return_inverse=True)
+    clusters = clusters.reshape(-1)
+    # degenerate triangles are never merged
+    clusters[degenerate] = (
+        clusters.max(initial=0) + 1 + np.arange(np.count_nonzero(degenerate))
+    )
+    # triangles sharing an edge, edges packed as a single integer key
+    vertex_count = vertices.shape[0]
+    edges = np.sort(triangles[:, ((0, 1), (1, 2), (2, 0))], axis=2).reshape(-1, 2)
+    edge_keys, edges = np.unique(
+        edges[:, 0].astype(np.int64) * vertex_count + edges[:, 1],
+        return_inverse=True,
+    )
+    edges = edges.reshape(-1)
+    edge_triangles = np.repeat(np.arange(triangle_count), 3)
+    order = np.argsort(edges, kind="stable")
+    same_edge = edges[order][1:] == edges[order][:-1]
+    triangles_a = edge_triangles[order][:-1][same_edge]
+    triangles_b = edge_triangles[order][1:][same_edge]
+    same_plane = clusters[triangles_a] == clusters[triangles_b]
+    labels = connected_components(
+        triangle_count, triangles_a[same_plane], triangles_b[same_plane]
+    )
+    patches = CoplanarPatches()
+    _, patches.triangle_patches = np.unique(labels, return_inverse=True)
+    patches.triangle_patches = patches.triangle_patches.reshape(-1)
+    patch_count = int(patches.triangle_patches.max(initial=-1)) + 1
+    patches.triangle_counts = np.bincount(
+        patches.triangle_patches, minlength=patch_count
+    )
+    # Euler characteristic of each patch, 1 - holes for a planar patch
+    edge_patches = patches.triangle_patches[edge_triangles]
+    patch_edges, patch_edge_uses = np.unique(
+        edge_patches.astype(np.int64) * edge_keys.shape[0] + edges,
+        return_counts=True,
+    )
+    edge_counts = np.bincount(patch_edges // edge_keys.shape[0], minlength=patch_count)
+    patch_vertices = np.unique(
+        np.repeat(patches.triangle_patches, 3).astype(np.int64) * vertex_count
+        + triangles.reshape(-1)
+    )
+    vertex_counts = np.bincount(patch_vertices // vertex_count, minlength=patch_count)
+    patches.hole_counts = np.maximum(
+        1 - (vertex_counts - edge_counts + patches.triangle_counts), 0
+    )
+    boundary_edges = patch_edges[patch_edge_uses == 1]
+    boundary_patches = boundary_edges // edge_keys.shape[0]
+    boundary_edge_keys = edge_keys[boundary_edges % edge_keys.shape[0]]
+    boundary_vertices = np.unique(
+        np.concatenate(
+            (
+                boundary_patches * vertex_count + boundary_edge_keys // vertex_count,
+                boundary_patches * vertex_count + boundary_edge_keys % vertex_count,
+            )
+        )
+    )
+    boundary_vertex_counts = np.bincount(
+        boundary_vertices // vertex_count, minlength=patch_count
+    )
+    patches.merged_triangle_counts = np.clip(
+        boundary_vertex_counts + 2 * patches.hole_counts - 2,
+        1,
+        patches.triangle_counts,
+    )
+    return patches
+
+
+def iter_header_commands(data: bytes):
+    """Yield (command id, second byte, second word) of the commands of a scene or
+    room header at the start of `data`, until the 0x14 end command."""
+    command_index = 0
+    while True:
+        command_id, command_byte, lower_word = struct.unpack_from(
+            ">BBxxI", data, command_index * 8
+        )
+        if command_id == 0x14:
+            break
+        yield command_id, command_byte, lower_word
+        command_index += 1
+
+
+def find_scene_mesh_collision_header_offset(data: bytes, log):
+    """Walk the scene header for the 0x03 command, return the mesh collision header offset."""
+    mesh_collision_header_offset = None
+    scene_header_command_count = 0
+    for command_id, _, lower_word in iter_header_commands(data):
+        scene_header_command_count += 1
+        if command_id == 0x03:
+            if mesh_collision_header_offset is not None:
+                log.warn(
+                    f"Found several 0x03 commands, ditching previous mesh collision header segment offset {mesh_collision_header_offset:08X}"
+                )
+            mesh_collision_header_segment_offset = lower_word
+            log.info(
+                f"Found 0x03 command: mesh header at 0x{mesh_collision_header_segment_offset:08X}"
+            )
+            mesh_collision_header_segment = mesh_collision_header_segment_offset >> 24
+            if mesh_collision_header_segment != 2:
+                log.warn(
+                    "Unexpected segment 0x{:02X} (expected 2)".format(
+                        mesh_collision_header_segment
+                    )
+                )
+            mesh_collision_header_offset = (
+                mesh_collision_header_segment_offset & 0xFFFFFF
+            )
+    if mesh_collision_header_offset is None:
+        log.error(
+            f"No 0x03 command was found in the scene header. ({scene_header_command_count + 1} commands read in total)"
+        )
+    return mesh_collision_header_offset
+
+
+def find_scene_room_count(data: bytes, log):
+    """Walk the scene header for the 0x04 room list command, return the room count."""
+    for command_id, room_count, lower_word in iter_header_commands(data):
+        if command_id == 0x04:
+            log.info(
+                f"Found 0x04 command: {room_count} rooms listed at 0x{lower_word:08X}"
+            )
+            return room_count
+    log.error("No 0x04 command was found in the scene header")
+    return None
+
+
+def find_room_files(scene_filepath: str, room_count: int):
+    """Find the room files of a scene, next to the scene file.
+
+    Rooms are looked for as `{name}_room_{i}` with the .zmap or .zroom extension,
+    with `name` the scene file name without extension and without `_scene`.
+    Missing rooms are None.
+    """
+    directory, scene_filename = os.path.split(scene_filepath)
+    name = os.path.splitext(scene_filename)[0]
+    if name.endswith("_scene"):
+        name = name[: -len("_scene")]
+    room_filepaths = list[str | None]()
+    for i in range(room_count):
+        room_filepath = None
+        for candidate in (
+            f"{name}_room_{i}.zmap",
+            f"{name}_room_{i}.zroom",
+            f"room_{i}.zmap",
+            f"room_{i}.zroom",
+        ):
+            if os.path.isfile(os.path.join(directory, candidate)):
+                room_filepath = os.path.join(directory, candidate)
+                break
+        room_filepaths.append(room_filepath)
+    return room_filepaths
+
+
+def room_display_lists(room_data: bytes, log):
+    """Return the segment addresses of the opaque and translucent display lists
+    listed in the room mesh header (0x0A command) of a room file."""
+    for command_id, _, lower_word in iter_header_commands(room_data):
+        if command_id == 0x0A:
+            mesh_header_offset = lower_word & 0xFFFFFF
+            break
+    else:
+        log.error("No 0x0A command was found in the room header")
+        return []
+    mesh_type = room_data[mesh_header_offset]
+    if mesh_type == 0:
+        count, start = struct.unpack_from(">BxxI", room_data, mesh_header_offset + 1)
+        entries = [
+            struct.unpack_from(">II", room_data, (start & 0xFFFFFF) + i * 8)
+            for i in range(count)
+        ]
+    elif mesh_type == 1:
+        (entry,) = struct.unpack_from(">I", room_data, mesh_header_offset + 4)
+        entries = [struct.unpack_from(">II", room_data, entry & 0xFFFFFF)]
+    elif mesh_type == 2:
+        count, start = struct.unpack_from(">BxxI", room_data, mesh_header_offset + 1)
+        entries = [
+            struct.unpack_from(">8xII", room_data, (start & 0xFFFFFF) + i * 16)
+            for i in range(count)
+        ]
+    else:
+        log.error(f"Unknown room mesh header type {mesh_type}")
+        return []
+    return [
+        display_list
+        for opa, xlu in entries
+        for display_list in (opa, xlu)
+        if display_list != 0
+    ]
+
+
+class DisplayListGeometryDecoder:
+    """Decode the geometry of F3DEX2 display lists (vertices and triangles only).
+
+    Vertex loads are cached by address, so vertices loaded several times are
+    decoded and output once.
+    """
+
+    G_VTX = 0x01
+    G_TRI1 = 0x05
+    G_TRI2 = 0x06
+    G_QUAD = 0x07
+    G_DL = 0xDE
+    G_ENDDL = 0xDF
+
+    VERTEX_DTYPE = np.dtype((">i2", (8,)))
+    # guard against display lists branching in a loop
+    MAX_COMMANDS = 0x100000
+
+    def __init__(self, segments: dict[int, bytes], log):
+        self.segments = segments
+        self.log = log
+        self.vertex_arrays = list[np.ndarray]()
+        self.vertex_count = 0
+        # (segment address, count) -> indices of the loaded vertices in the output
+        self.vertex_loads = dict[tuple[int, int], np.ndarray]()
+        self.triangles = list[tuple[int, int, int]]()
+
+    def resolve(self, segment_address: int):
+        data = self.segments.get(segment_address >> 24)
+        offset = segment_address & 0xFFFFFF
+        if data is None or offset >= len(data):
+            return None, None
+        return data, offset
+
+    def load_vertices(self, segment_address: int, count: int):
+        key = segment_address, count
+        indices = self.vertex_loads.get(key)
+        if indices is None:
+            data, offset = self.resolve(segment_address)
+            if data is None or offset + count * 16 > len(data):
+                self.log.warn(f"Skipping vertex load from 0x{segment_address:08X}")
+                return None
+            vertices = np.frombuffer(data, self.VERTEX_DTYPE, count, offset)[:, :3]
+            indices = np.arange(self.vertex_count, self.vertex_count + count)
+            self.vertex_arrays.append(vertices)
+            self.vertex_count += count
+            self.vertex_loads[key] = indices
+        return indices
+
+    def decode(self, display_list: int):
+        # vertex buffer slot -> index in the output, -1 if not loaded
+        slots = [-1] * 64
+        stack = list[tuple[bytes, int]]()
+        data, offset = self.resolve(display_list)
+        command_count = 0
+        while data is not None:
+            command_count += 1
+            if command_count > self.MAX_COMMANDS or offset + 8 > len(data):
+                self.log.warn(f"Stopped decoding display list 0x{display_list:08X}")
+                break
+            w0, w1 = struct.unpack_from(">II", data, offset)
+            offset += 8
+            opcode = w0 >> 24
+            if opcode == self.G_VTX:
+                count = (w0 >> 12) & 0xFF
+                first = ((w0 >> 1) & 0x7F) - count
+                indices = self.load_vertices(w1, count)
+                if indices is not None and first >= 0:
+                    slots[first : first + count] = indices.tolist()
+            elif opcode == self.G_TRI1:
+                self.add_triangle(slots, w0)
+            elif opcode in (self.G_TRI2, self.G_QUAD):
+                self.add_triangle(slots, w0)
+                self.add_triangle(slots, w1)
+            elif opcode == self.G_DL:
+                if (w0 >> 16) & 0xFF == 0:
+                    # call, return here after
+                    stack.append((data, offset))
+                data, offset = self.resolve(w1)
+                if data is None:
+                    self.log.warn(f"Skipping display list at 0x{w1:08X}")
+                    data, offset = stack.pop() if stack else (None, None)
+            elif opcode == self.G_ENDDL:
+                data, offset = stack.pop() if stack else (None, None)
+
+    def add_triangle(self, slots: list[int], word: int):
+        triangle = (
+            slots[(word >> 17) & 0x7F],
+            slots[(word >> 9) & 0x7F],
+            slots[(word >> 1) & 0x7F],
+        )
+        if -1 not in triangle:
+            self.triangles.append(triangle)
+
+    def arrays(self):
+        """Return (vertices, triangles) arrays of everything decoded so far."""
+        vertices = (
+            np.concatenate(self.vertex_arrays).astype(np.float64)
+            if self.vertex_arrays
+            else np.zeros((0, 3))
+        )
+        triangles = np.array(self.triangles, dtype=np.int64).reshape(-1, 3)
+        return vertices, triangles
+
+
+class PrintLog:
+    """Log to stdout, for use outside of an operator (e.g. `blender --background`)."""
+
+    def debug(self, msg):
+        print("DEBUG:", msg)
+
+    def info(self, msg):
+        print("INFO:", msg)
+
+    def warn(self, msg):
+        print("WARNING:", msg)
+
+    def error(self, msg):
+        print("ERROR:", msg)
+
+
+def load_mesh_collision_file(
+    filepath: str,
+    header_offset: int | None = None,
+    log=None,
+    profile: GameProfile = GAME_PROFILES["OOT"],
+):
+    """Read and decode the collision of a file, outside of an operator.
+
+    Without `header_offset`, the header is found with the scene header for .zscene
+    files, or as the most likely header found by scanning the file otherwise.
+
+    Returns (mesh collision header, decoded collision), or None if no header was found.
+    """
+    if log is None:
+        log = PrintLog()
+    with open(filepath, "rb") as f:
+        data = f.read()
+    if header_offset is None:
+        if filepath.endswith(".zscene"):
+            header_offset = find_scene_mesh_collision_header_offset(data, log)
+        else:
+            candidates = scan_mesh_collision_headers(data)
+            if candidates:
+                header_offset = candidates[0].offset
+            else:
+                log.error(f"No mesh collision header was found in {filepath}")
+        if header_offset is None:
+            return None
+    mesh_collision_header = MeshCollisionHeader()
+    mesh_collision_header.load(data, header_offset)
+    decoded = DecodedMeshCollision()
+    decoded.load(data, mesh_collision_header, profile)
+    return mesh_collision_header, decoded
+
+
+def validate_mesh_collision_file(
+    filepath: str,
+    header_offset: int | None = None,
+    log=None,
+):
+    """Validate the collision of a file, see `load_mesh_collision_file`.
+
+    Meant for batch use, for example from CI:
+    `blender --background --python-expr "import z64_collision_importer as z; ..."`
+    """
+    loaded = load_mesh_collision_file(filepath, header_offset, log)
+    if loaded is None:
+        return None
+    return validate_mesh_collision(*loaded)
+
+
+# PLY property type and glTF accessor component type of each array dtype
+PLY_TYPE_NAMES = {"u1": "uchar", "u2": "ushort", "u4": "uint", "i2": "short"}
+GLTF_COMPONENT_TYPES = {"u1": 5121, "u2": 5123, "i2": 5122, "f4": 5126}
+GLTF_ACCESSOR_TYPES = {1: "SCALAR", 2: "VEC2", 3: "VEC3"}
+
+
+def mesh_collision_face_attributes(decoded: DecodedMeshCollision):
+    """Triangles and per-face attributes of decoded collision, as written by the exporters.
+
+    Polygons with out of range vertex indices are left out.
+
+    Returns ((m, 3) vertex indices, dict of attribute name to (m,) or (m, 3) array).
+    """
+    valid = decoded.valid_polygons()
+    keys = decoded.polygon_material_keys(valid)
+    return decoded.polygon_vertex_indices[valid].astype(np.uint16), {
+        "polytype_index": decoded.polygon_polytype_index[valid].astype(np.uint16),
+        "polytype_hi": keys[:, 2],
+        "polytype_lo": keys[:, 3],
+        "ignore_flags": keys[:, 0].astype(np.uint8),
+        "enable_conveyor": keys[:, 1].astype(np.uint8),
+        "normal": decoded.polygon_normals[valid].astype(np.int16),
+        "d": decoded.polygon_d[valid].astype(np.int16),
+    }
+
+
+def export_mesh_collision_ply(decoded: DecodedMeshCollision, filepath: str):
+    """Write decoded collision as binary PLY, in game units.
+
+    Faces have the attributes of `mesh_collision_face_attributes` as custom
+    properties, (m, 3) attributes as `<name>_x`, `<name>_y` and `<name>_z`.
+    """
+    triangles, attributes = mesh_collision_face_attributes(decoded)
+    face_fields = [("vertex_count", "u1"), ("vertex_indices", "<u2", (3,))]
+    lines = [
+        "ply",
+        "format binary_little_endian 1.0",
+        "comment z64 collision, game units",
+        f"element vertex {decoded.vertices.shape[0]}",
+        "property short x",
+        "property short y",
+        "property short z",
+        f"element face {triangles.shape[0]}",
+        "property list uchar ushort vertex_indices",
+    ]
+    for name, array in attributes.items():
+        ply_type = PLY_TYPE_NAMES[array.dtype.str[1:]]
+        if array.ndim == 1:
+            face_fields.append((name, array.dtype.newbyteorder("<")))
+            lines.append(f"property {ply_type} {name}")
+        else:
+            face_fields.append((name, array.dtype.newbyteorder("<"), (3,)))
+            lines.extend(f"property {ply_type} {name}_{axis}" for axis in "xyz")
+    lines.append("end_header")
+    faces = np.empty(triangles.shape[0], dtype=face_fields)
+    faces["vertex_count"] = 3
+    faces["vertex_indices"] = triangles
+    for name, array in attributes.items():
+        faces[name] = array
+    with open(filepath, "wb") as f:
+        f.write(("\n".join(lines) + "\n").encode("ascii"))
+        f.write(decoded.vertices.astype("<i2").tobytes())
+        f.write(faces.tobytes())
+
+
+def export_mesh_collision_gltf(decoded: DecodedMeshCollision, filepath: str):
+    """Write decoded collision as a binary glTF (.glb), in game units (Y up).
+
+    The per-face attributes of `mesh_collision_face_attributes` are accessors
+    referenced by name from the primitive's `extras.z64_face_attributes`.
+    glTF only allows 32-bit unsigned integers for indices, so the polytype words
+    are VEC2 UNSIGNED_SHORT accessors of their (high, low) halves.
+    Collision without polygons is written as a node without a mesh.
+    """
+    triangles, attributes = mesh_collision_face_attributes(decoded)
+    positions = decoded.vertices.astype("<f4")
+    buffer = bytearray()
+    buffer_views = []
+    accessors = []
+
+    def add_accessor(array: np.ndarray, count: int, target=None, **accessor):
+        if array.dtype == np.uint32:
+            array = np.stack((array >> 16, array & 0xFFFF), axis=-1).astype(np.uint16)
+        # accessors must be aligned to their component size
+        buffer.extend(b"\0" * (-len(buffer) % 4))
+        array = np.ascontiguousarray(array, dtype=array.dtype.newbyteorder("<"))
+        buffer_view = {
+            "buffer": 0,
+            "byteOffset": len(buffer),
+            "byteLength": array.nbytes,
+        }
+        if target is not None:
+            buffer_view["target"] = target
+        buffer_views.append(buffer_view)
+        buffer.extend(array.tobytes())
+        accessors.append(
+            {
+                "bufferView": len(buffer_views) - 1,
+                "componentType": GLTF_COMPONENT_TYPES[array.dtype.str[1:]],
+                "count": count,
+                "type": GLTF_ACCESSOR_TYPES[array.size // count],
+                **accessor,
+            }
+        )
+        return len(accessors) - 1
+
+    node = {"name": "z64collision"}
+    meshes = []
+    if triangles.shape[0] != 0:
+        primitive = {
+            "attributes": {
+                "POSITION": add_accessor(
+                    positions,
+                    positions.shape[0],
+                    target=34962,  # ARRAY_BUFFER
+                    # must be the exact bounds
+                    min=positions.min(axis=0).tolist(),
+                    max=positions.max(axis=0).tolist(),
+                )
+            },
+            "indices": add_accessor(
+                triangles.reshape(-1),
+                triangles.size,
+                target=34963,  # ELEMENT_ARRAY_BUFFER
+            ),
+            "mode": 4,  # TRIANGLES
+            "extras": {
+                "z64_face_attributes": {
+                    name: add_accessor(array, array.shape[0])
+                    for name, array in attributes.items()
+                }
+            },
+        }
+        node["mesh"] = len(meshes)
+        meshes.append({"primitives": [primitive]})
+    buffer.extend(b"\0" * (-len(buffer) % 4))
+    gltf = {
+        "asset": {"version": "2.0", "generator": "z64_collision_importer"},
+        "scene": 0,
+        "scenes": [{"nodes": [0]}],
+        "nodes": [node],
+    }
+    if meshes:
+        gltf["meshes"] = meshes
+        gltf["accessors"] = accessors
+        gltf["bufferViews"] = buffer_views
+        gltf["buffers"] = [{"byteLength": len(buffer)}]
+    json_chunk = json.dumps(gltf, separators=(",", ":")).encode("utf-8")
+    json_chunk += b" " * (-len(json_chunk) % 4)
+    bin_chunk = struct.pack("<I4s", len(buffer), b"BIN\0") + buffer if meshes else b""
+    with open(filepath, "wb") as f:
+        f.write(
+            struct.pack("<4sII", b"glTF", 2, 12 + 8 + len(json_chunk) + len(bin_chunk))
+        )
+        f.write(struct.pack("<I4s", len(json_chunk), b"JSON"))
+        f.write(json_chunk)
+        f.write(bin_chunk)
+
+
+MESH_COLLISION_EXPORTERS = {
+    ".ply": export_mesh_collision_ply,
+    ".glb": export_mesh_collision_gltf,
+}
+
+
+def export_mesh_collision_file(
+    filepath: str,
+    out_filepath: str,
+    header_offset: int | None = None,
+    log=None,
+):
+    """Export the collision of a file to .ply or .glb (depending on the extension
+    of `out_filepath`), see `load_mesh_collision_file`.
+
+    Returns True if the file was written.
+    """
+    if log is None:
+        log = PrintLog()
+    exporter = MESH_COLLISION_EXPORTERS.get(os.path.splitext(out_filepath)[1].lower())
+    if exporter is None:
+        log.error(f"Unknown export format {out_filepath}")
+        return False
+    loaded = load_mesh_collision_file(filepath, header_offset, log)
+    if loaded is None:
+        return False
+    _, decoded = loaded
+    exporter(decoded, out_filepath)
+    return True
+
+
+def export_mesh_collision_files(
+    filepaths: list[str],
+    out_directory: str,
+    extension: str = ".ply",
+    max_workers: int | None = None,
+    log=None,
+):
+    """Export the collision of many files (e.g. every .zscene of a dump) in parallel,
+    each to `<out_directory>/<file name><extension>`.
+
+    Returns the list of files written.
+    """
+    out_filepaths = [
+        os.path.join(out_directory, os.path.basename(filepath) + extension)
+        for filepath in filepaths
+    ]
+    with concurrent.futures.ThreadPoolExecutor(max_workers) as executor:
+        written = executor.map(
+            lambda paths: export_mesh_collision_file(*paths, log=log),
+            zip(filepaths, out_filepaths),
+        )
+        return [out_filepath for out_filepath, ok in zip(out_filepaths, written) if ok]
+
+
+def mesh_collision_key_color(key: tuple[int, bool, int, int]):
+    """The (r, g, b) color of the material for a
+    (ignore_flags, enable_conveyor, polytype_hi, polytype_lo) key, with Color Materials.
+    """
+    rand = random.Random(struct.pack("I" * len(key), *key))
+    return [rand.random() for i in range(3)]
+
+
+def mesh_collision_thumbnail(
+    decoded: DecodedMeshCollision,
+    size: int = 256,
+    shade: bool = True,
+    chunk_size: int = 0x100000,
+):
+    """Rasterize decoded collision seen from above, without rendering.
+
+    Each pixel shows the highest polygon over it, with the color of its material
+    (see `mesh_collision_key_color`), darker the lower it is if `shade`. Walls,
+    thinner than a pixel from above, are drawn as lines.
+
+    Returns (height, width, 4) uint8 RGBA pixels, at most `size` pixels wide and
+    high, with rows going from -z to +z and transparent pixels where there is
+    no collision.
+    """
+    valid = decoded.valid_polygons()
+    if valid.shape[0] == 0:
+        return np.zeros((1, 1, 4), dtype=np.uint8)
+    tris = decoded.vertices[decoded.polygon_vertex_indices[valid]].astype(np.float64)
+    # material colors
+    keys = decoded.polygon_material_keys(valid)
+    _, first_polygons, key_ids = np.unique(
+        row_keys(keys), return_index=True, return_inverse=True
+    )
+    key_colors = np.array(
+        [mesh_collision_key_color(material_key(key)) for key in keys[first_polygons]]
+    )
+    colors = key_colors[key_ids.reshape(-1)]
+    # pixel space, pixel (i, j) has its center at (i + 0.5, j + 0.5)
+    mins = tris[:, :, (0, 2)].min(axis=(0, 1))
+    extent = tris[:, :, (0, 2)].max(axis=(0, 1)) - mins
+    pixel_size = max(extent.max(), 1) / size
+    width, height = np.maximum(np.ceil(extent / pixel_size), 1).astype(np.int64)
+    uv = (tris[:, :, (0, 2)] - mins) / pixel_size
+    edges = np.roll(uv, -1, axis=1) - uv
+    area = edges[:, 0, 1] * -edges[:, 2, 0] - edges[:, 0, 0] * -edges[:, 2, 1]
+    edge_lengths = np.linalg.norm(edges, axis=2)
+    # triangles less than a pixel wide from above are drawn as their longest edge
+    is_line = np.abs(area) < edge_lengths.max(axis=1)
+    longest_edges = edge_lengths.argmax(axis=1)
+    line_starts = uv[np.arange(uv.shape[0]), longest_edges]
+    line_vectors = edges[np.arange(uv.shape[0]), longest_edges]
+    # edge functions a u + b v + c of each triangle, all >= 0 inside it, scaled to
+    # pixel distances to the edges
+    with np.errstate(divide="ignore", invalid="ignore"):
+        winding = np.nan_to_num(np.sign(area)[:, np.newaxis] / edge_lengths)
+    edge_functions = np.stack(
+        (
+            edges[:, :, 1] * winding,
+            -edges[:, :, 0] * winding,
+            (edges[:, :, 0] * uv[:, :, 1] - edges[:, :, 1] * uv[:, :, 0]) * winding,
+        ),
+        axis=2,
+    )
+    # height of the polygon's plane a u + b v + c, or its top for walls
+    top = tris[:, :, 1].max(axis=1)
+    bottom = tris[:, :, 1].min(axis=1)
+    normals = decoded.polygon_normals[valid] / NORMAL_ONE
+    d = decoded.polygon_d[valid].astype(np.float64)
+    use_plane = np.abs(normals[:, 1]) > 0.1
+    normal_y = np.where(use_plane, normals[:, 1], 1)
+    height_functions = np.stack(
+        (
+            -normals[:, 0] * pixel_size / normal_y,
+            -normals[:, 2] * pixel_size / normal_y,
+            -(normals[:, 0] * mins[0] + normals[:, 2] * mins[1] + d) / normal_y,
+        ),
+        axis=1,
+    )
+    height_functions[~use_plane] = 0
+    height_functions[~use_plane, 2] = top[~use_plane]
+    # candidate pixels are the pixels of each triangle's bounding box
+    margin = np.where(is_line, 0.5, 0)[:, np.newaxis]
+    starts = np.maximum(np.ceil(uv.min(axis=1) - margin - 0.5), 0).astype(np.int64)
+    ends = np.minimum(
+        np.floor(uv.max(axis=1) + margin - 0.5), (width - 1, height - 1)
+    ).astype(np.int64)
+    spans = np.maximum(ends - starts + 1, 0)
+    pixel_counts = spans[:, 0] * spans[:, 1]
+    cumulative_counts = np.cumsum(pixel_counts)
+    pixel_polygons = []
+    pixel_indices = []
+    pixel_heights = []
+    # in chunks of triangles with about chunk_size candidate pixels
+    chunk_start = 0
+    while chunk_start < tris.shape[0]:
+        previous_count = cumulative_counts[chunk_start] - pixel_counts[chunk_start]
+        chunk_end = max(
+            np.searchsorted(
+                cumulative_counts, previous_count + chunk_size, side="right"
+            ),
+            chunk_start + 1,
+        )
+        counts = pixel_counts[chunk_start:chunk_end]
+        t = np.repeat(np.arange(chunk_start, chunk_end), counts)
+        offsets = np.arange(t.shape[0]) - np.repeat(np.cumsum(counts) - counts, counts)
+        chunk_start = chunk_end
+        i = starts[t, 0] + offsets % spans[t, 0]
+        j = starts[t, 1] + offsets // spans[t, 0]
+        points = np.stack((i + 0.5, j + 0.5, np.ones(t.shape[0])), axis=1)
+        # with a tolerance of 1e-6 pixel, for pixel centers on an edge shared by
+        # two triangles, which rounding can put outside of both
+        keep = (np.einsum("ikj,ij->ik", edge_functions[t], points) >= -1e-6).all(axis=1)
+        lines = np.flatnonzero(is_line[t])
+        to_points = points[lines, :2] - line_starts[t[lines]]
+        vectors = line_vectors[t[lines]]
+        ratios = np.clip(
+            np.einsum("ij,ij->i", to_points, vectors)
+            / np.maximum(np.einsum("ij,ij->i", vectors, vectors), 1e-12),
+            0,
+            1,
+        )
+        keep[lines] = (
+            np.linalg.norm(to_points - ratios[:, np.newaxis] * vectors, axis=1) <= 0.5
+        )
+        t = t[keep]
+        pixel_polygons.append(t)
+        pixel_indices.append(j[keep] * width + i[keep])
+        pixel_heights.append(
+            np.clip(
+                np.einsum("ij,ij->i", height_functions[t], points[keep]),
+                bottom[t],
+                top[t],
+            )
+        )
+    pixel_polygons = np.concatenate(pixel_polygons)
+    pixel_indices = np.concatenate(pixel_indices)
+    pixel_heights = np.concatenate(pixel_heights)
+    # keep the highest polygon of each pixel
+    last = last_in_groups(pixel_indices, pixel_heights)
+    pixel_indices = pixel_indices[last]
+    pixel_colors = colors[pixel_polygons[last]]
+    if shade:
+        low, high = bottom.min(), top.max()
+        pixel_colors *= ((pixel_heights[last] - low) / max(high - low, 1) * 0.6 + 0.4)[
+            :, np.newaxis
+        ]
+    pixels = np.zeros((height * width, 4), dtype=np.uint8)
+    pixels[pixel_indices, :3] = np.rint(pixel_colors * 255)
+    pixels[pixel_indices, 3] = 255
+    return pixels.reshape(height, width, 4)
+
+
+def write_png(filepath: str, pixels: np.ndarray):
+    """Write (height, width, 4) uint8 RGBA pixels as a PNG file."""
+    height, width = pixels.shape[:2]
+    # each row is prefixed by its filter type, 0 (none)
+    rows = np.zeros((height, 1 + width * 4), dtype=np.uint8)
+    rows[:, 1:] = pixels.reshape(height, width * 4)
+
+    def chunk(chunk_type: bytes, chunk_data: bytes):
+        return (
+            struct.pack(">I", len(chunk_data))
+            + chunk_type
+            + chunk_data
+            + struct.pack(">I", zlib.crc32(chunk_type + chunk_data))
+        )
+
+    with open(filepath, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        # 8 bits per channel, color type 6 (RGBA)
+        f.write(chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)))
+        f.write(chunk(b"IDAT", zlib.compress(rows.tobytes())))
+        f.write(chunk(b"IEND", b""))
+
+
+def write_mesh_collision_thumbnail(
+    filepath: str,
+    out_filepath: str,
+    header_offset: int | None = None,
+    size: int = 256,
+    log=None,
+):
+    """Write a PNG thumbnail of the collision of a file, see `load_mesh_collision_file`
+    and `mesh_collision_thumbnail`.
+
+    Returns True if the file was written.
+    """
+    loaded = load_mesh_collision_file(filepath, header_offset, log)
+    if loaded is None:
+        return False
+    _, decoded = loaded
+    write_png(out_filepath, mesh_collision_thumbnail(decoded, size))
+    return True
+
+
+def write_mesh_collision_thumbnails(
+    filepaths: list[str],
+    out_directory: str,
+    size: int = 256,
+    max_workers: int | None = None,
+    log=None,
+):
+    """Write PNG thumbnails of the collision of many files (e.g. every .zscene of a
+    dump) in parallel, each to `<out_directory>/<file name>.png`.
+
+    Returns the list of files written.
+    """
+    out_filepaths = [
+        os.path.join(out_directory, os.path.basename(filepath) + ".png")
+        for filepath in filepaths
+    ]
+    with concurrent.futures.ThreadPoolExecutor(max_workers) as executor:
+        written = executor.map(
+            lambda paths: write_mesh_collision_thumbnail(*paths, size=size, log=log),
+            zip(filepaths, out_filepaths),
+        )
+        return [out_filepath for out_filepath, ok in zip(out_filepaths, written) if ok]
+
+
+class CollisionMaterials:
+    """Create a material for each (ignore_flags, enable_conveyor, polytype_hi, polytype_lo)
+    key, reusing it for every polygon (and every mesh) with that key."""
+
+    def __init__(self, options: "ZELDA64_OT_import_collision"):
+        self.options = options
+        self.game = options.game
+        self.profile = GAME_PROFILES[options.game]
+        self.materials = dict[Any, bpy.types.Material]()
+
+    def get(self, key: tuple[int, bool, int, int], polytype_index: int):
+        material = self.materials.get(key)
+        if material is None:
+            ignore_flags, enable_conveyor, polytype_hi, polytype_lo = key
+            material = self.create_polygon_material(
+                ignore_flags,
+                enable_conveyor,
+                polytype_index,
+                polytype_hi,
+                polytype_lo,
+            )
+            if self.options.set_material_color:
+                material.diffuse_color = mesh_collision_key_color(key) + [1]
+                material.specular_intensity = 0
+                material.roughness = 1
+            self.materials[key] = material
+        return material
+
+    def create_polygon_material(
+        self,
+        ignore_flags,
+        enable_conveyor,
+        polytype_index,
+        polytype_hi,
+        polytype_lo,
+    ):
+        material = bpy.data.materials.new(
+            f"{ignore_flags:03b} {enable_conveyor:d} {polytype_index} {polytype_hi:08X}_{polytype_lo:08X}"
+        )
+        props: ZELDA64_MaterialMeshCollisionProperties = (
+            material.z64_import_mesh_collision
+        )
+        props.is_import_material = True
+        # polytype
+        props.polytype_index = polytype_index
+        props.polytype_raw = f"{polytype_hi:08X}_{polytype_lo:08X}"
+        polytype_props: ZELDA64_MaterialMeshCollisionPolytypeProperties = props.polytype
+        # set first, the enum values depend on it
+        polytype_props.game = self.game
+        for attr, value in self.profile.decode_polytype(
+            polytype_hi, polytype_lo
+        ).items():
+            setattr(polytype_props, attr, value)
+        # ignore flags
+        props.ignore_flags_raw = ignore_flags
+        props.ignore_projectiles = (ignore_flags & 0b100) != 0
+        props.ignore_entities = (ignore_flags & 0b010) != 0
+        props.ignore_camera = (ignore_flags & 0b001) != 0
+        # enable conveyor
+        props.enable_conveyor = enable_conveyor
+        return material
+        # return bpy.data.materials.new(f'ign={ignore_flags:b} enconv={enable_conveyor} pt{polytype_index}=0x{polytype_hi:08X}_{polytype_lo:08X}')
+
+
 class CollisionImporter:
+    """Import collision into a bmesh, one bmesh face per polygon.
+
+    The state kept for the whole import is the bmesh index of the first
+    collision vertex (the others follow it) and arrays of material keys and
+    indices, instead of Python objects per vertex or key.
+    """
 
     def __init__(
         self,
@@ -351,151 +2484,250 @@ class CollisionImporter:
         self.bmesh = bm
         self.options = options
         self.log = log
-        self.material_indices = dict[Any, int]()
+        self.materials = CollisionMaterials(options)
+        # (k, 4) (ignore_flags, enable_conveyor, polytype_hi, polytype_lo) keys
+        # and their index in mesh.materials
+        self.material_keys = np.zeros((0, 4), dtype=np.uint32)
+        self.material_key_indices = np.zeros(0, dtype=np.int32)
 
     def import_collision(self, data: bytes, mesh_collision_header: MeshCollisionHeader):
         # todo ignoring some stuff here
-        self.import_vertices(
-            data,
-            mesh_collision_header.vertex_array_segment_offset & 0xFFFFFF,
-            mesh_collision_header.vertex_array_length,
-        )
-        polytypes_table_offset = (
-            mesh_collision_header.polytypes_table_segment_offset & 0xFFFFFF
+        decoded = DecodedMeshCollision()
+        decoded.load(data, mesh_collision_header, self.materials.profile)
+        if decoded.truncated_vertices or decoded.truncated_polygons:
+            self.log.error(
+                f"Data is truncated, missing {decoded.truncated_vertices} vertices "
+                f"and {decoded.truncated_polygons} polygons"
+            )
+        self.import_vertices(decoded.vertices)
+        self.import_polygons(decoded, self.get_polygon_material_indices(decoded))
+
+    def get_polygon_material_indices(self, decoded: DecodedMeshCollision):
+        """Material index of each polygon, appending materials for new keys
+        in the order polygons first use them."""
+        keys = decoded.polygon_material_keys()
+        _, first_polygons, key_ids = np.unique(
+            row_keys(keys), return_index=True, return_inverse=True
         )
-
-        def get_polygon_material_index(
-            ignore_flags: int,
-            enable_conveyor: bool,
-            polytype_index: int,
-        ):
-            unpacked = struct.unpack_from(
-                ">II", data, polytypes_table_offset + polytype_index * 8
-            )
-            unpacked: tuple[int, ...]
-            polytype_hi, polytype_lo = unpacked
-            key = (ignore_flags, enable_conveyor, polytype_hi, polytype_lo)
-            material_index = self.material_indices.get(key)
-            if material_index is None:
-                material_index = len(self.mesh.materials)
-                material = self.create_polygon_material(
-                    ignore_flags,
-                    enable_conveyor,
-                    polytype_index,
-                    polytype_hi,
-                    polytype_lo,
+        key_ids = key_ids.reshape(-1)
+        unique_keys = keys[first_polygons]
+        known = match_keys(row_keys(unique_keys), row_keys(self.material_keys))
+        unique_material_indices = np.full(known.shape[0], -1, dtype=np.int32)
+        unique_material_indices[known >= 0] = self.material_key_indices[
+            known[known >= 0]
+        ]
+        new = np.flatnonzero(known < 0)
+        for i in new[np.argsort(first_polygons[new])]:
+            unique_material_indices[i] = len(self.mesh.materials)
+            self.mesh.materials.append(
+                self.materials.get(
+                    material_key(unique_keys[i]),
+                    int(decoded.polygon_polytype_index[first_polygons[i]]),
                 )
-                if self.options.set_material_color:
-                    rand = random.Random(struct.pack("I" * len(key), *key))
-                    material.diffuse_color = [rand.random() for i in range(3)] + [1]
-                    material.specular_intensity = 0
-                    material.roughness = 1
-                self.mesh.materials.append(material)
-                self.material_indices[key] = material_index
-            return material_index
-
-        self.import_polygons(
-            data,
-            mesh_collision_header.polygon_array_segment_offset & 0xFFFFFF,
-            mesh_collision_header.polygon_array_length,
-            get_polygon_material_index,
+            )
+        self.material_keys = np.concatenate((self.material_keys, unique_keys[new]))
+        self.material_key_indices = np.concatenate(
+            (self.material_key_indices, unique_material_indices[new])
         )
+        return unique_material_indices[key_ids]
 
-    def import_vertices(self, data: bytes, offset: int, length: int):
-        self.vertices = [
-            self.bmesh.verts.new(
-                self.global_matrix
-                @ mathutils.Vector(struct.unpack_from(">hhh", data, offset + i * 6))
-            )
-            for i in range(length)
-        ]
+    def import_vertices(self, vertices: np.ndarray):
+        """Add the collision vertices to the bmesh, in order after its existing vertices."""
+        self.vertex_start = len(self.bmesh.verts)
+        for (co,) in iter_rows(transform_points(self.global_matrix, vertices)):
+            self.bmesh.verts.new(co)
         self.bmesh.verts.ensure_lookup_table()
 
     def import_polygons(
         self,
-        data: bytes,
-        offset: int,
-        length: int,
-        get_polygon_material_index: Callable[[int, bool, int], int],
+        decoded: DecodedMeshCollision,
+        polygon_material_indices: np.ndarray,
     ):
-        for i in range(length):
-            unpacked = struct.unpack_from(">HHHHhhhh", data, offset + i * 16)
-            unpacked: tuple[int, ...]
-            (polytype_index, val_a, val_b, val_c, normal_x, normal_y, normal_z, d) = (
-                unpacked
+        verts = self.bmesh.verts
+        valid = decoded.valid_polygons()
+        if valid.shape[0] != decoded.polygon_vertex_indices.shape[0]:
+            self.log.error(
+                f"Skipping {decoded.polygon_vertex_indices.shape[0] - valid.shape[0]} "
+                "polygons with out of range vertex indices"
             )
+        for bm_vertex_indices, normal, material_index in iter_rows(
+            self.vertex_start + decoded.polygon_vertex_indices[valid],
+            transform_points(self.global_matrix, decoded.polygon_normals[valid]),
+            polygon_material_indices[valid],
+        ):
             try:
-                face = self.bmesh.faces.new(
-                    self.vertices[val & 0x1FFF] for val in (val_a, val_b, val_c)
-                )
+                face = self.bmesh.faces.new(verts[i] for i in bm_vertex_indices)
             except ValueError as e:
                 self.log.error(f"{e!r}")
                 duplicated_vertices = tuple(
-                    self.bmesh.verts.new(self.vertices[val & 0x1FFF].co)
-                    for val in (val_a, val_b, val_c)
+                    verts.new(verts[i].co) for i in bm_vertex_indices
                 )
-                self.bmesh.verts.ensure_lookup_table()
+                verts.ensure_lookup_table()
                 face = self.bmesh.faces.new(duplicated_vertices)
                 face.select_set(True)  # todo
-            face.normal = self.global_matrix @ mathutils.Vector(
-                (normal_x, normal_y, normal_z)
-            )
-            ignore_flags = val_a >> 13
-            enable_conveyor = (val_b & 0x2000) != 0
-            face.material_index = get_polygon_material_index(
-                ignore_flags, enable_conveyor, polytype_index
-            )
+            face.normal = normal
+            face.material_index = material_index
             # todo what about d?
         self.bmesh.faces.ensure_lookup_table()
 
-    def create_polygon_material(
+
+class SplitCollisionImporter:
+    """Import decoded collision as several meshes, built in bulk.
+
+    Polygons are grouped by material key ("POLYTYPE"), by the XZ tile of
+    `tile_size` game units their center is in ("TILE"), or not at all ("NONE").
+    """
+
+    def __init__(
+        self,
+        global_matrix: mathutils.Matrix,
+        options: "ZELDA64_OT_import_collision",
+        log,
+    ):
+        self.global_matrix = global_matrix
+        self.options = options
+        self.log = log
+        self.materials = CollisionMaterials(options)
+
+    def import_collision(
+        self,
+        decoded: DecodedMeshCollision,
+        split_by: str,
+        tile_size: float,
+        name: str = "z64collision",
+    ):
+        """Return a list of (name, mesh) parts."""
+        polygon_ids = decoded.valid_polygons()
+        if polygon_ids.shape[0] != decoded.polygon_vertex_indices.shape[0]:
+            self.log.error(
+                f"Skipping {decoded.polygon_vertex_indices.shape[0] - polygon_ids.shape[0]} "
+                "polygons with out of range vertex indices"
+            )
+        # material keys
+        keys = decoded.polygon_material_keys(polygon_ids)
+        unique_keys, first_polygons, key_ids = np.unique(
+            keys, axis=0, return_index=True, return_inverse=True
+        )
+        key_ids = key_ids.reshape(-1)
+        materials = [
+            self.materials.get(
+                material_key(key),
+                int(decoded.polygon_polytype_index[polygon_ids[first_polygon]]),
+            )
+            for key, first_polygon in zip(unique_keys, first_polygons)
+        ]
+        # groups
+        if split_by == "NONE":
+            group_ids = np.zeros(polygon_ids.shape[0], dtype=np.int64)
+            group_names = [""]
+        elif split_by == "POLYTYPE":
+            group_ids = key_ids
+            group_names = [material.name for material in materials]
+        elif split_by == "TILE":
+            centers = decoded.vertices[
+                decoded.polygon_vertex_indices[polygon_ids]
+            ].mean(axis=1)
+            tiles = np.floor(centers[:, (0, 2)] / tile_size).astype(np.int64)
+            unique_tiles, group_ids = np.unique(tiles, axis=0, return_inverse=True)
+            group_ids = group_ids.reshape(-1)
+            group_names = [f"tile {tile_x} {tile_z}" for tile_x, tile_z in unique_tiles]
+        else:
+            raise ValueError(split_by)
+        order = np.argsort(group_ids, kind="stable")
+        group_starts = np.searchsorted(
+            group_ids[order], np.arange(len(group_names) + 1)
+        )
+        parts = []
+        for group_id, group_name in enumerate(group_names):
+            group = order[group_starts[group_id] : group_starts[group_id + 1]]
+            part_name = f"{name} {group_name}" if group_name else name
+            mesh = bpy.data.meshes.new(part_name)
+            try:
+                self.build_part(
+                    mesh,
+                    decoded,
+                    polygon_ids[group],
+                    key_ids[group],
+                    materials,
+                )
+            except:
+                bpy.data.meshes.remove(mesh)
+                raise
+            parts.append((part_name, mesh))
+        return parts
+
+    def build_part(
         self,
-        ignore_flags,
-        enable_conveyor,
-        polytype_index,
-        polytype_hi,
-        polytype_lo,
+        mesh: bpy.types.Mesh,
+        decoded: DecodedMeshCollision,
+        polygon_ids: np.ndarray,
+        key_ids: np.ndarray,
+        materials: list[bpy.types.Material],
     ):
-        material = bpy.data.materials.new(
-            f"{ignore_flags:03b} {enable_conveyor:d} {polytype_index} {polytype_hi:08X}_{polytype_lo:08X}"
+        used_vertices, faces = np.unique(
+            decoded.polygon_vertex_indices[polygon_ids], return_inverse=True
         )
-        props: ZELDA64_MaterialMeshCollisionProperties = (
-            material.z64_import_mesh_collision
+        faces = faces.reshape(-1, 3)
+        vertices = decoded.vertices[used_vertices]
+        # like CollisionImporter, faces that can't share vertices get their own
+        repeated_vertex = (
+            (faces[:, 0] == faces[:, 1])
+            | (faces[:, 1] == faces[:, 2])
+            | (faces[:, 2] == faces[:, 0])
+        )
+        problem = np.flatnonzero(repeated_vertex | duplicate_polygons(faces))
+        if problem.shape[0] != 0:
+            self.log.error(
+                f"{mesh.name}: {problem.shape[0]} degenerate or duplicate polygons, using separate vertices"
+            )
+            separate_vertices = vertices[faces[problem]].reshape(-1, 3)
+            faces[problem] = vertices.shape[0] + np.arange(
+                separate_vertices.shape[0]
+            ).reshape(-1, 3)
+            vertices = np.concatenate((vertices, separate_vertices))
+        used_keys, material_indices = np.unique(key_ids, return_inverse=True)
+        for key_id in used_keys:
+            mesh.materials.append(materials[key_id])
+        mesh_from_arrays(
+            mesh,
+            transform_points(self.global_matrix, vertices),
+            faces,
+            material_indices=material_indices.reshape(-1),
+        )
+
+
+def transform_points(matrix: mathutils.Matrix, points: np.ndarray):
+    """Apply a 4x4 matrix to (n, 3) points."""
+    matrix = np.array(matrix)
+    return points @ matrix[:3, :3].T + matrix[:3, 3]
+
+
+def iter_rows(*arrays: np.ndarray, chunk_size: int = 0x1000):
+    """Zip the rows of arrays as Python objects, converting one chunk at a time."""
+    for start in range(0, arrays[0].shape[0], chunk_size):
+        yield from zip(
+            *(array[start : start + chunk_size].tolist() for array in arrays)
         )
-        props.is_import_material = True
-        # found the wiki source on accident https://discordapp.com/channels/388361645073629187/388362111534759942/535678606324793354
-        # polytype
-        props.polytype_index = polytype_index
-        props.polytype_raw = f"{polytype_hi:08X}_{polytype_lo:08X}"
-        polytype_props: ZELDA64_MaterialMeshCollisionPolytypeProperties = props.polytype
-        # polytype high word
-        polytype_props.no_horse = polytype_hi >> 31 != 0
-        polytype_props.minus_one_unit = polytype_hi >> 30 & 1 != 0
-        polytype_props.floor = "{:X}".format(polytype_hi >> 26 & 0xF)
-        polytype_props.wall = "{:X}".format(polytype_hi >> 21 & 0x1F)
-        # polytype_hi >> 18 & 7 # unused
-        polytype_props.special = "{:X}".format(polytype_hi >> 13 & 0x1F)
-        polytype_props.exit = polytype_hi >> 8 & 0x1F
-        polytype_props.camera = polytype_hi & 0xFF
-        # polytype low word
-        # polytype_lo >> 28 & 0b1111 # padding
-        polytype_props.wall_damage = polytype_lo & 0x8000000 != 0
-        polytype_props.conveyor_direction = polytype_lo >> 21 & 0x3F
-        polytype_props.conveyor_speed = "{:X}".format(polytype_lo >> 18 & 7)
-        polytype_props.hookshot = polytype_lo >> 17 & 1 != 0
-        polytype_props.echo = polytype_lo >> 11 & 0x3F
-        polytype_props.lighting = polytype_lo >> 6 & 0x1F
-        polytype_props.slope = "{:X}".format(polytype_lo >> 4 & 3)
-        polytype_props.sound = "{:X}".format(polytype_lo & 0xF)
-        # ignore flags
-        props.ignore_flags_raw = ignore_flags
-        props.ignore_projectiles = (ignore_flags & 0b100) != 0
-        props.ignore_entities = (ignore_flags & 0b010) != 0
-        props.ignore_camera = (ignore_flags & 0b001) != 0
-        # enable conveyor
-        props.enable_conveyor = enable_conveyor
-        return material
-        # return bpy.data.materials.new(f'ign={ignore_flags:b} enconv={enable_conveyor} pt{polytype_index}=0x{polytype_hi:08X}_{polytype_lo:08X}')
+
+
+def mesh_from_arrays(
+    mesh: bpy.types.Mesh,
+    vertices: np.ndarray,
+    faces: np.ndarray,
+    material_indices: np.ndarray | None = None,
+):
+    """Fill an empty mesh in bulk from (n, 3) coordinates and (m, k) vertex indices."""
+    mesh.vertices.add(vertices.shape[0])
+    mesh.vertices.foreach_set("co", vertices.astype(np.float32).ravel())
+    mesh.loops.add(faces.size)
+    mesh.loops.foreach_set("vertex_index", faces.astype(np.int32).ravel())
+    mesh.polygons.add(faces.shape[0])
+    mesh.polygons.foreach_set(
+        "loop_start", np.arange(0, faces.size, faces.shape[1], dtype=np.int32)
+    )
+    if material_indices is not None:
+        mesh.polygons.foreach_set("material_index", material_indices.astype(np.int32))
+    mesh.update(calc_edges=True)
 
 
 def add_arrow(
@@ -691,6 +2923,148 @@ class ZELDA64_OT_search_material_by_mesh_collision_properties(bpy.types.Operator
         return {"FINISHED"}
 
 
+class ZELDA64_OT_mesh_collision_merge_coplanar(bpy.types.Operator):
+    bl_idname = "zelda64.mesh_collision_merge_coplanar"
+    bl_label = "Merge coplanar z64 collision triangles"
+    bl_description = (
+        "Estimate how many triangles merging adjacent coplanar triangles of a same "
+        "collision material would save, and optionally merge them"
+    )
+    bl_options = {"REGISTER", "UNDO"}
+
+    rewrite: bpy.props.BoolProperty(
+        name="Rewrite",
+        description="Merge and retriangulate the patches, instead of only reporting the reduction",
+        default=False,
+    )
+    normal_tolerance: bpy.props.FloatProperty(
+        name="Normal Tolerance",
+        description="Unit normals are rounded to this to find coplanar triangles",
+        min=1e-6,
+        default=1e-3,
+    )
+    distance_tolerance: bpy.props.FloatProperty(
+        name="Distance Tolerance",
+        description="Plane distances are rounded to this to find coplanar triangles, in mesh units",
+        min=1e-6,
+        default=0.5,
+    )
+
+    @staticmethod
+    def material_ids(mesh: bpy.types.Mesh):
+        """One id per material slot, same for slots with the same polytype key."""
+        keys = dict()
+        ids = list[int]()
+        for material in mesh.materials:
+            if material is None:
+                key = None
+            elif material.z64_import_mesh_collision.is_import_material:
+                props: ZELDA64_MaterialMeshCollisionProperties = (
+                    material.z64_import_mesh_collision
+                )
+                key = (
+                    props.ignore_flags_raw,
+                    props.enable_conveyor,
+                    props.polytype_raw,
+                )
+            else:
+                key = material.name
+            ids.append(keys.setdefault(key, len(keys)))
+        return np.array(ids or [0], dtype=np.int64)
+
+    def execute(self, context):
+        total_count = 0
+        total_projected_count = 0
+        for object in context.selected_objects:
+            if object.type != "MESH":
+                continue
+            mesh: bpy.types.Mesh = object.data
+            loop_totals = np.empty(len(mesh.polygons), dtype=np.int32)
+            mesh.polygons.foreach_get("loop_total", loop_totals)
+            loop_starts = np.empty(len(mesh.polygons), dtype=np.int32)
+            mesh.polygons.foreach_get("loop_start", loop_starts)
+            material_indices = np.empty(len(mesh.polygons), dtype=np.int32)
+            mesh.polygons.foreach_get("material_index", material_indices)
+            loop_vertices = np.empty(len(mesh.loops), dtype=np.int32)
+            mesh.loops.foreach_get("vertex_index", loop_vertices)
+            vertices = np.empty(len(mesh.vertices) * 3, dtype=np.float64)
+            mesh.vertices.foreach_get("co", vertices)
+            # only triangles are merged, other faces are left as is
+            triangle_polygons = np.flatnonzero(loop_totals == 3)
+            triangles = loop_vertices[
+                loop_starts[triangle_polygons, np.newaxis] + np.arange(3)
+            ]
+            material_ids = self.material_ids(mesh)
+            patches = find_coplanar_patches(
+                vertices.reshape(-1, 3),
+                triangles,
+                material_ids[
+                    np.minimum(
+                        material_indices[triangle_polygons], len(material_ids) - 1
+                    )
+                ],
+                self.normal_tolerance,
+                self.distance_tolerance,
+            )
+            projected_count = (
+                len(mesh.polygons)
+                - triangle_polygons.shape[0]
+                + patches.projected_triangle_count()
+            )
+            self.report(
+                {"INFO"},
+                f"{object.name}: {len(mesh.polygons)} -> {projected_count} faces "
+                f"({patches.triangle_counts.shape[0]} coplanar patches)",
+            )
+            total_count += len(mesh.polygons)
+            total_projected_count += projected_count
+            if self.rewrite:
+                self.merge(mesh, triangle_polygons, patches)
+        if total_count:
+            self.report(
+                {"INFO"},
+                f"Projected reduction: {total_count} -> {total_projected_count} faces "
+                f"(-{100 * (total_count - total_projected_count) / total_count:.1f}%)",
+            )
+        return {"FINISHED"}
+
+    def merge(
+        self,
+        mesh: bpy.types.Mesh,
+        triangle_polygons: np.ndarray,
+        patches: CoplanarPatches,
+    ):
+        # patches with holes can't be dissolved into a single face
+        merged = np.flatnonzero(
+            (patches.merged_triangle_counts < patches.triangle_counts)
+            & (patches.hole_counts == 0)
+        )
+        order = np.argsort(patches.triangle_patches, kind="stable")
+        bounds = np.searchsorted(
+            patches.triangle_patches[order], np.stack((merged, merged + 1))
+        )
+        bm = bmesh.new()
+        try:
+            bm.from_mesh(mesh)
+            bm.faces.ensure_lookup_table()
+            patch_faces = [
+                [bm.faces[i] for i in triangle_polygons[order[start:end]]]
+                for start, end in bounds.T
+            ]
+            for faces in patch_faces:
+                region = bmesh.ops.dissolve_faces(bm, faces=faces, use_verts=True)
+                bmesh.ops.triangulate(
+                    bm,
+                    faces=region["region"],
+                    quad_method="BEAUTY",
+                    ngon_method="BEAUTY",
+                )
+            bm.to_mesh(mesh)
+        finally:
+            bm.free()
+        mesh.update()
+
+
 def hexProperty_update_factory(attr):
     def hexProperty_update(self, context):
         value = getattr(self, attr)
@@ -708,17 +3082,21 @@ def hexProperty_update_factory(attr):
     return hexProperty_update
 
 
-@bpy_extras.io_utils.orientation_helper(axis_forward="-Z", axis_up="Y")
-class ZELDA64_OT_import_collision(bpy.types.Operator, bpy_extras.io_utils.ImportHelper):
-    bl_idname = "zelda64.import_collision"
-    bl_label = "Import z64 collision"
-    bl_options = {"REGISTER", "UNDO"}
+class MeshCollisionFileOperatorMixin:
+    """Options and helpers shared by operators reading mesh collision from a file."""
 
     filter_glob: bpy.props.StringProperty(
         default="*.zobj;*.zscene;*.zdata",
         options={"HIDDEN"},
     )
 
+    game: bpy.props.EnumProperty(
+        items=GAME_ITEMS,
+        name="Game",
+        description="Game the file is from, for the polytype layout and values",
+        default="OOT",
+    )
+
     scale: bpy.props.FloatProperty(
         name="Scale",
         description="How much to scale the created mesh by",
@@ -727,17 +3105,6 @@ class ZELDA64_OT_import_collision(bpy.types.Operator, bpy_extras.io_utils.Import
         default=1,
     )
 
-    adjust_clip_end: bpy.props.BoolProperty(
-        name="Adjust Clip End",
-        description="Set Clip End so that the whole mesh can be viewed more easily",
-        default=True,
-    )
-    set_material_color: bpy.props.BoolProperty(
-        name="Color Materials",
-        description="Set a different color for each collision material created",
-        default=True,
-    )
-
     segment: bpy.props.EnumProperty(
         items=[
             (
@@ -758,7 +3125,12 @@ class ZELDA64_OT_import_collision(bpy.types.Operator, bpy_extras.io_utils.Import
             ]
         ]
         + [
-            ("AUTO", "Auto", "6 if .zobj, 2 if .zscene", 0x100),
+            (
+                "AUTO",
+                "Auto",
+                "6 if .zobj, 2 if .zscene, from the header found otherwise",
+                0x100,
+            ),
         ],
         name="Segment",
         description="What segment should the segment offsets being read use (for sanity checks)",
@@ -767,7 +3139,7 @@ class ZELDA64_OT_import_collision(bpy.types.Operator, bpy_extras.io_utils.Import
 
     file_type: bpy.props.EnumProperty(
         items=[
-            ("AUTO", "Auto", "zobj if .zobj, zscene if .zscene", 0),
+            ("AUTO", "Auto", "zobj if .zobj, zscene if .zscene, other otherwise", 0),
             (
                 "zscene",
                 "zscene",
@@ -775,6 +3147,12 @@ class ZELDA64_OT_import_collision(bpy.types.Operator, bpy_extras.io_utils.Import
                 1,
             ),
             ("zobj", "zobj", "Object file", 2),
+            (
+                "other",
+                "Other",
+                "Other file (for example .zdata), the segment is taken from the header found",
+                3,
+            ),
         ],
         name="File Type",
         description="Type of the file to import, for locating the mesh collision header and for sanity checks",
@@ -787,77 +3165,49 @@ class ZELDA64_OT_import_collision(bpy.types.Operator, bpy_extras.io_utils.Import
         update=hexProperty_update_factory("header_offset"),
     )
 
-    def execute(self, context):
+    def get_global_matrix(self):
         global_matrix = bpy_extras.io_utils.axis_conversion(
             from_forward=self.axis_forward,
             from_up=self.axis_up,
         ).to_4x4()
         global_matrix @= mathutils.Matrix.Scale(self.scale, 4)
-        _file_type = self.file_type
-
-        def get_file_type():
-            nonlocal _file_type
-            if _file_type == "AUTO":
-                if self.filepath.endswith(".zscene"):
-                    _file_type = "zscene"
-                elif self.filepath.endswith(".zobj"):
-                    _file_type = "zobj"
-                else:
-                    self.error(
-                        f"Cannot determine file type (zscene/zobj) automatically (set it manually) from filepath {self.filepath}"
-                    )
-                    _file_type = None
-            return _file_type
+        return global_matrix
+
+    def get_game_profile(self):
+        return GAME_PROFILES[self.game]
+
+    def get_file_type(self):
+        if self.file_type != "AUTO":
+            return self.file_type
+        if self.filepath.endswith(".zscene"):
+            return "zscene"
+        elif self.filepath.endswith(".zobj"):
+            return "zobj"
+        else:
+            return "other"
 
-        # load data
+    def read_file(self):
         self.info(f"Reading {self.filepath}")
         with open(self.filepath, "rb") as f:
-            data = f.read()
-        # load header
-        if not self.header_offset and get_file_type() == "zscene":
-            mesh_collision_header_offset = None
-            scene_header_command_index = 0
-            while True:
-                command_id, lower_word = struct.unpack_from(
-                    ">BxxxI", data, scene_header_command_index * 8
-                )
-                if command_id == 0x03:
-                    if mesh_collision_header_offset is not None:
-                        self.warn(
-                            f"Found several 0x03 commands, ditching previous mesh collision header segment offset {mesh_collision_header_offset:08X}"
-                        )
-                    mesh_collision_header_segment_offset = lower_word
-                    self.info(
-                        f"Found 0x03 command: mesh header at 0x{mesh_collision_header_segment_offset:08X}"
-                    )
-                    mesh_collision_header_segment = (
-                        mesh_collision_header_segment_offset >> 24
-                    )
-                    if mesh_collision_header_segment != 2:
-                        self.warn(
-                            "Unexpected segment 0x{:02X} (expected 2)".format(
-                                mesh_collision_header_segment
-                            )
-                        )
-                    mesh_collision_header_offset = (
-                        mesh_collision_header_segment_offset & 0xFFFFFF
-                    )
-                elif command_id == 0x14:
-                    break
-                scene_header_command_index += 1
+            return f.read()
+
+    def load_mesh_collision_header(self, data: bytes):
+        """Locate, load and sanity check the mesh collision header.
+
+        Returns None (after logging an error) if it could not be located.
+        """
+        if not self.header_offset and self.get_file_type() == "zscene":
+            mesh_collision_header_offset = find_scene_mesh_collision_header_offset(
+                data, log=self
+            )
             if mesh_collision_header_offset is None:
-                self.error(
-                    f"No 0x03 command was found in the scene header. ({scene_header_command_index} commands read in total)"
-                )
-                return {"CANCELLED"}
+                return None
         elif self.header_offset:
             mesh_collision_header_offset = int(self.header_offset, 16)
         else:
-            file_type = get_file_type()
-            self.error(
-                f"Cannot determine header offset automatically for file type {file_type}"
-            )
-            return {"CANCELLED"}
+            mesh_collision_header_offset = self.find_mesh_collision_header_offset(data)
+            if mesh_collision_header_offset is None:
+                return None
         self.info(
             f"Reading mesh collision header at 0x{mesh_collision_header_offset:X}"
         )
@@ -865,17 +3215,160 @@ class ZELDA64_OT_import_collision(bpy.types.Operator, bpy_extras.io_utils.Import
         mesh_collision_header.load(data, mesh_collision_header_offset)
         # header sanity checks
         if self.segment == "AUTO":
-            file_type = get_file_type()
-            if not file_type:
-                return {"CANCELLED"}
+            file_type = self.get_file_type()
             expected_segment = {
                 "zscene": 2,
                 "zobj": 6,
+                "other": mesh_collision_header.vertex_array_segment_offset >> 24,
             }[file_type]
             self.info(f"Expected segment defaulted to 0x{expected_segment:X}")
         else:
             expected_segment = int(self.segment)
         mesh_collision_header.sanity_check_segments(expected_segment, log=self)
+        return mesh_collision_header
+
+    def get_expected_segment(self):
+        """The segment set in the options, or the usual one for the file type (if any)."""
+        if self.segment != "AUTO":
+            return int(self.segment)
+        return {
+            "zscene": 2,
+            "zobj": 6,
+            "other": None,
+        }[self.get_file_type()]
+
+    def find_mesh_collision_header_offset(self, data: bytes):
+        """Scan the file for mesh collision headers, return the most likely one's offset."""
+        expected_segment = self.get_expected_segment()
+        candidates = scan_mesh_collision_headers(data, expected_segment)
+        if not candidates:
+            self.error("No mesh collision header was found, set the header offset")
+            return None
+        for candidate in candidates:
+            self.info(
+                f"Found mesh collision header candidate at 0x{candidate.offset:X} "
+                f"(segment 0x{candidate.segment:02X}, confidence {candidate.confidence:.2f})"
+            )
+        if len(candidates) > 1:
+            self.warn(
+                f"Found {len(candidates)} mesh collision header candidates, using the most likely one"
+            )
+        return candidates[0].offset
+
+    def debug(self, msg):
+        print(msg)
+        self.report({"DEBUG"}, msg)
+
+    def info(self, msg):
+        self.report({"INFO"}, msg)
+
+    def warn(self, msg):
+        self.report({"WARNING"}, msg)
+
+    def error(self, msg):
+        self.report({"ERROR"}, msg)
+
+
+def adjust_clip_end(mesh: bpy.types.Mesh):
+    """Make sure the whole mesh is within Clip End of the 3D viewports."""
+    if len(mesh.vertices) == 0:
+        return
+    # 500 ~ (default clip_end) / (default cube size)
+    min_clip_end = 500 * math.sqrt(max(v.co.length_squared for v in mesh.vertices))
+    for area in bpy.context.screen.areas:
+        if area.type != "VIEW_3D":
+            continue
+        for space in area.spaces:
+            if space.type != "VIEW_3D":
+                continue
+            if space.clip_end < min_clip_end:
+                space.clip_end = min_clip_end
+
+
+@bpy_extras.io_utils.orientation_helper(axis_forward="-Z", axis_up="Y")
+class ZELDA64_OT_import_collision(
+    MeshCollisionFileOperatorMixin,
+    bpy.types.Operator,
+    bpy_extras.io_utils.ImportHelper,
+):
+    bl_idname = "zelda64.import_collision"
+    bl_label = "Import z64 collision"
+    bl_options = {"REGISTER", "UNDO"}
+
+    adjust_clip_end: bpy.props.BoolProperty(
+        name="Adjust Clip End",
+        description="Set Clip End so that the whole mesh can be viewed more easily",
+        default=True,
+    )
+    set_material_color: bpy.props.BoolProperty(
+        name="Color Materials",
+        description="Set a different color for each collision material created",
+        default=True,
+    )
+    validate: bpy.props.BoolProperty(
+        name="Validate",
+        description="Check the collision for degenerate, duplicate or inconsistent polygons before importing",
+        default=False,
+    )
+    split_by: bpy.props.EnumProperty(
+        items=(
+            ("NONE", "None", "Import everything as a single object", 0),
+            (
+                "POLYTYPE",
+                "Polytype",
+                "One object per collision material (polytype, ignore flags and conveyor)",
+                1,
+            ),
+            ("TILE", "Tile", "One object per square tile of the XZ plane", 2),
+        ),
+        name="Split By",
+        description="Split the collision into several objects, parented to an empty",
+        default="NONE",
+    )
+    tile_size: bpy.props.FloatProperty(
+        name="Tile Size",
+        description="Size of the tiles when splitting by tile, in game units",
+        min=1,
+        default=2000,
+    )
+    import_rooms: bpy.props.BoolProperty(
+        name="Room Geometry",
+        description="Also import the visual geometry of the scene's rooms as a faded overlay "
+        "(room files are looked for next to the scene file)",
+        default=False,
+    )
+    import_all_headers: bpy.props.BoolProperty(
+        name="All Headers",
+        description="Import every mesh collision header found in the file as its own object "
+        "(for example the dynapoly collision of actors in object files)",
+        default=False,
+    )
+    min_confidence: bpy.props.FloatProperty(
+        name="Min Confidence",
+        description="Confidence score from which headers found are imported with All Headers",
+        min=0,
+        max=1,
+        default=0.9,
+    )
+
+    def execute(self, context):
+        global_matrix = self.get_global_matrix()
+        if self.import_all_headers:
+            return self.import_all(global_matrix)
+        # load data
+        data = self.read_file()
+        # load header
+        mesh_collision_header = self.load_mesh_collision_header(data)
+        if mesh_collision_header is None:
+            return {"CANCELLED"}
+        if self.validate:
+            decoded = DecodedMeshCollision()
+            decoded.load(data, mesh_collision_header, self.get_game_profile())
+            validate_mesh_collision(mesh_collision_header, decoded).log_summary(
+                log=self
+            )
+        if self.split_by != "NONE":
+            return self.import_split(global_matrix, data, mesh_collision_header)
         # import collision mesh
         mesh = bpy.data.meshes.new("z64collision")
         bm = bmesh.new()
@@ -894,32 +3387,336 @@ class ZELDA64_OT_import_collision(bpy.types.Operator, bpy_extras.io_utils.Import
         object = bpy.data.objects.new("z64collision", mesh)
         bpy.context.scene.collection.objects.link(object)
         if self.adjust_clip_end:
-            # 500 ~ (default clip_end) / (default cube size)
-            min_clip_end = 500 * math.sqrt(
-                max(v.co.length_squared for v in mesh.vertices)
+            adjust_clip_end(mesh)
+        if self.import_rooms:
+            self.import_room_geometry(global_matrix, data, object)
+        return {"FINISHED"}
+
+    def import_all(self, global_matrix: mathutils.Matrix):
+        self.info(f"Mapping {self.filepath}")
+        if os.path.getsize(self.filepath) < MESH_COLLISION_HEADER_SIZE:
+            self.error("File is too small to contain a mesh collision header")
+            return {"CANCELLED"}
+        data = np.memmap(self.filepath, mode="r")
+        expected_segment = self.get_expected_segment()
+        candidates = [
+            candidate
+            for candidate in scan_mesh_collision_headers(data, expected_segment)
+            if candidate.confidence >= self.min_confidence
+        ]
+        if not candidates:
+            self.error(
+                f"No mesh collision header with a confidence of at least {self.min_confidence:.2f} was found"
             )
-            for area in bpy.context.screen.areas:
-                if area.type != "VIEW_3D":
-                    continue
-                for space in area.spaces:
-                    if space.type != "VIEW_3D":
-                        continue
-                    if space.clip_end < min_clip_end:
-                        space.clip_end = min_clip_end
+            return {"CANCELLED"}
+        # materials are shared by all headers
+        collision_importer = SplitCollisionImporter(
+            global_matrix, options=self, log=self
+        )
+        parent = bpy.data.objects.new(os.path.basename(self.filepath), None)
+        bpy.context.scene.collection.objects.link(parent)
+        for candidate in sorted(candidates, key=lambda candidate: candidate.offset):
+            self.info(
+                f"Importing mesh collision header at 0x{candidate.offset:X} (confidence {candidate.confidence:.2f})"
+            )
+            decoded = DecodedMeshCollision()
+            decoded.load(data, candidate.mesh_collision_header, self.get_game_profile())
+            parts = collision_importer.import_collision(
+                decoded,
+                self.split_by,
+                self.tile_size,
+                name=f"z64collision 0x{candidate.offset:X}",
+            )
+            for name, mesh in parts:
+                object = bpy.data.objects.new(name, mesh)
+                object.parent = parent
+                bpy.context.scene.collection.objects.link(object)
+                if self.adjust_clip_end:
+                    adjust_clip_end(mesh)
+        self.info(f"Success! ({len(candidates)} headers)")
         return {"FINISHED"}
 
-    def debug(self, msg):
-        print(msg)
-        self.report({"DEBUG"}, msg)
+    def import_split(
+        self,
+        global_matrix: mathutils.Matrix,
+        data: bytes,
+        mesh_collision_header: MeshCollisionHeader,
+    ):
+        decoded = DecodedMeshCollision()
+        decoded.load(data, mesh_collision_header, self.get_game_profile())
+        collision_importer = SplitCollisionImporter(
+            global_matrix, options=self, log=self
+        )
+        parts = collision_importer.import_collision(
+            decoded, self.split_by, self.tile_size
+        )
+        self.info(f"Success! ({len(parts)} objects)")
+        parent = bpy.data.objects.new("z64collision", None)
+        bpy.context.scene.collection.objects.link(parent)
+        for name, mesh in parts:
+            object = bpy.data.objects.new(name, mesh)
+            object.parent = parent
+            bpy.context.scene.collection.objects.link(object)
+            if self.adjust_clip_end:
+                adjust_clip_end(mesh)
+        if self.import_rooms:
+            self.import_room_geometry(global_matrix, data, parent)
+        return {"FINISHED"}
 
-    def info(self, msg):
-        self.report({"INFO"}, msg)
+    def import_room_geometry(
+        self,
+        global_matrix: mathutils.Matrix,
+        data: bytes,
+        parent: bpy.types.Object,
+    ):
+        if self.get_file_type() != "zscene":
+            self.warn("Room geometry can only be imported along a scene")
+            return
+        room_count = find_scene_room_count(data, log=self)
+        if room_count is None:
+            return
+        material_name = "z64 room geometry"
+        material = bpy.data.materials.get(material_name)
+        if material is None:
+            material = bpy.data.materials.new(material_name)
+            material.diffuse_color = (0.8, 0.8, 0.8, 0.25)
+        for i, room_filepath in enumerate(find_room_files(self.filepath, room_count)):
+            if room_filepath is None:
+                self.warn(f"Room {i} file not found next to {self.filepath}")
+                continue
+            self.info(f"Reading {room_filepath}")
+            with open(room_filepath, "rb") as f:
+                room_data = f.read()
+            decoder = DisplayListGeometryDecoder({2: data, 3: room_data}, log=self)
+            for display_list in room_display_lists(room_data, log=self):
+                decoder.decode(display_list)
+            vertices, triangles = decoder.arrays()
+            name = f"z64room {i}"
+            mesh = bpy.data.meshes.new(name)
+            mesh.materials.append(material)
+            mesh_from_arrays(mesh, transform_points(global_matrix, vertices), triangles)
+            # display lists may draw degenerate or duplicate triangles
+            mesh.validate()
+            object = bpy.data.objects.new(name, mesh)
+            object.parent = parent
+            object.show_transparent = True
+            object.hide_select = True
+            bpy.context.scene.collection.objects.link(object)
 
-    def warn(self, msg):
-        self.report({"WARNING"}, msg)
 
-    def error(self, msg):
-        self.report({"ERROR"}, msg)
+@bpy_extras.io_utils.orientation_helper(axis_forward="-Z", axis_up="Y")
+class ZELDA64_OT_mesh_collision_floor_coverage(
+    MeshCollisionFileOperatorMixin,
+    bpy.types.Operator,
+    bpy_extras.io_utils.ImportHelper,
+):
+    bl_idname = "zelda64.mesh_collision_floor_coverage"
+    bl_label = "Analyze z64 collision floor coverage"
+    bl_options = {"REGISTER", "UNDO"}
+
+    cell_size: bpy.props.FloatProperty(
+        name="Cell Size",
+        description="Size of the sampling grid cells, in game units",
+        min=1,
+        soft_max=100,
+        default=10,
+    )
+    query_as: bpy.props.EnumProperty(
+        items=(
+            ("ENTITY", "Entity", "Ignore polygons ignored by entities", 0),
+            ("CAMERA", "Camera", "Ignore polygons ignored by the camera", 1),
+            (
+                "PROJECTILES",
+                "Projectiles",
+                "Ignore polygons ignored by projectiles",
+                2,
+            ),
+        ),
+        name="Query As",
+        description="What the floor is looked for, for ignore flags",
+        default="ENTITY",
+    )
+    create_image: bpy.props.BoolProperty(
+        name="Create Image",
+        description="Create a top-down image of the floor coverage, shaded by floor height",
+        default=True,
+    )
+    create_overlay: bpy.props.BoolProperty(
+        name="Create Overlay",
+        description="Create a mesh with a face for each cell without floor or with a void floor",
+        default=True,
+    )
+
+    def execute(self, context):
+        global_matrix = self.get_global_matrix()
+        data = self.read_file()
+        mesh_collision_header = self.load_mesh_collision_header(data)
+        if mesh_collision_header is None:
+            return {"CANCELLED"}
+        decoded = DecodedMeshCollision()
+        decoded.load(data, mesh_collision_header, self.get_game_profile())
+        xp_flags = {
+            "ENTITY": COLPOLY_IGNORE_ENTITY,
+            "CAMERA": COLPOLY_IGNORE_CAMERA,
+            "PROJECTILES": COLPOLY_IGNORE_PROJECTILES,
+        }[self.query_as]
+        origin, coverage, heights = floor_coverage(
+            mesh_collision_header,
+            decoded,
+            self.cell_size,
+            profile=self.get_game_profile(),
+            xp_flags=xp_flags,
+        )
+        no_floor_count = np.count_nonzero(coverage == FLOOR_COVERAGE_NO_FLOOR)
+        void_count = np.count_nonzero(coverage == FLOOR_COVERAGE_VOID)
+        self.info(
+            f"Sampled {coverage.size} cells: {no_floor_count} without floor, {void_count} with a void floor"
+        )
+        name = f"{os.path.basename(self.filepath)} floor coverage"
+        if self.create_image:
+            pixels = floor_coverage_pixels(coverage, heights)
+            image = bpy.data.images.new(name, pixels.shape[1], pixels.shape[0])
+            image.pixels.foreach_set(pixels.ravel())
+            image.update()
+            self.info(f"Created image {image.name}")
+        if self.create_overlay:
+            hole_cells = np.flatnonzero(coverage.ravel() != FLOOR_COVERAGE_FLOOR)
+            hole_coverage = coverage.ravel()[hole_cells]
+            cell_x, cell_z = np.divmod(hole_cells, coverage.shape[1])
+            x0 = origin[0] + cell_x * self.cell_size
+            z0 = origin[1] + cell_z * self.cell_size
+            x1 = x0 + self.cell_size
+            z1 = z0 + self.cell_size
+            y = np.where(
+                hole_coverage == FLOOR_COVERAGE_VOID,
+                heights.ravel()[hole_cells] + 1,
+                mesh_collision_header.miny,
+            )
+            vertices = np.stack(
+                (
+                    np.stack((x0, y, z0), axis=1),
+                    np.stack((x0, y, z1), axis=1),
+                    np.stack((x1, y, z1), axis=1),
+                    np.stack((x1, y, z0), axis=1),
+                ),
+                axis=1,
+            ).reshape(-1, 3)
+            faces = np.arange(vertices.shape[0]).reshape(-1, 4)
+            mesh = bpy.data.meshes.new(name)
+            for material_name, color in (
+                ("z64 floor coverage: no floor", (1, 0, 0, 0.5)),
+                ("z64 floor coverage: void floor", (1, 0, 1, 0.5)),
+            ):
+                material = bpy.data.materials.get(material_name)
+                if material is None:
+                    material = bpy.data.materials.new(material_name)
+                    material.diffuse_color = color
+                mesh.materials.append(material)
+            mesh_from_arrays(
+                mesh,
+                transform_points(global_matrix, vertices),
+                faces,
+                material_indices=hole_coverage - 1,
+            )
+            object = bpy.data.objects.new(name, mesh)
+            object.show_transparent = True
+            bpy.context.scene.collection.objects.link(object)
+        return {"FINISHED"}
+
+
+@bpy_extras.io_utils.orientation_helper(axis_forward="-Z", axis_up="Y")
+class ZELDA64_OT_mesh_collision_diff(
+    MeshCollisionFileOperatorMixin,
+    bpy.types.Operator,
+    bpy_extras.io_utils.ImportHelper,
+):
+    bl_idname = "zelda64.mesh_collision_diff"
+    bl_label = "Diff z64 collision"
+    bl_options = {"REGISTER", "UNDO"}
+
+    other_filepath: bpy.props.StringProperty(
+        name="Other File",
+        description="File to compare the selected file (A) against (B)",
+        subtype="FILE_PATH",
+    )
+    other_header_offset: bpy.props.StringProperty(
+        name="Other Header Offset",
+        description="Offset of the mesh collision header in the other file",
+        default="",
+        update=hexProperty_update_factory("other_header_offset"),
+    )
+
+    DIFF_MATERIALS = (
+        # DIFF_REMOVED
+        ("z64 diff: removed", (1, 0, 0, 0.5)),
+        # DIFF_ADDED
+        ("z64 diff: added", (0, 1, 0, 0.5)),
+        # DIFF_MOVED
+        ("z64 diff: moved", (0, 0.4, 1, 0.5)),
+        # DIFF_CHANGED_POLYTYPE
+        ("z64 diff: changed polytype", (1, 0.8, 0, 0.5)),
+    )
+
+    def execute(self, context):
+        global_matrix = self.get_global_matrix()
+        data = self.read_file()
+        mesh_collision_header = self.load_mesh_collision_header(data)
+        if mesh_collision_header is None:
+            return {"CANCELLED"}
+        decoded_a = DecodedMeshCollision()
+        decoded_a.load(data, mesh_collision_header, self.get_game_profile())
+        self.info(f"Reading {self.other_filepath}")
+        loaded = load_mesh_collision_file(
+            bpy.path.abspath(self.other_filepath),
+            int(self.other_header_offset, 16) if self.other_header_offset else None,
+            log=self,
+            profile=self.get_game_profile(),
+        )
+        if loaded is None:
+            return {"CANCELLED"}
+        _, decoded_b = loaded
+        diff = diff_mesh_collisions(decoded_a, decoded_b)
+        diff.log_summary(log=self)
+        # one face per difference, at its position in A for removed polygons, in B otherwise
+        vertex_groups = (
+            (decoded_a, diff.removed, DIFF_REMOVED),
+            (decoded_b, diff.added, DIFF_ADDED),
+            (decoded_b, diff.moved[:, 1], DIFF_MOVED),
+            (decoded_b, diff.changed_polytype[:, 1], DIFF_CHANGED_POLYTYPE),
+        )
+        vertices = np.concatenate(
+            [
+                decoded.vertices[decoded.polygon_vertex_indices[polygons]].reshape(
+                    -1, 3
+                )
+                for decoded, polygons, change in vertex_groups
+            ]
+        ).astype(np.float64)
+        material_indices = np.concatenate(
+            [
+                np.full(polygons.shape[0], change)
+                for decoded, polygons, change in vertex_groups
+            ]
+        )
+        faces = np.arange(vertices.shape[0]).reshape(-1, 3)
+        name = f"z64collision diff {os.path.basename(self.filepath)} {os.path.basename(self.other_filepath)}"
+        mesh = bpy.data.meshes.new(name)
+        for material_name, color in self.DIFF_MATERIALS:
+            material = bpy.data.materials.get(material_name)
+            if material is None:
+                material = bpy.data.materials.new(material_name)
+                material.diffuse_color = color
+            mesh.materials.append(material)
+        mesh_from_arrays(
+            mesh,
+            transform_points(global_matrix, vertices),
+            faces,
+            material_indices=material_indices,
+        )
+        object = bpy.data.objects.new(name, mesh)
+        object.show_transparent = True
+        bpy.context.scene.collection.objects.link(object)
+        return {"FINISHED"}
 
 
 def menu_func_import(self, context):
@@ -933,9 +3730,14 @@ classes = (
     ZELDA64_MaterialMeshCollisionPolytypeProperties,
     ZELDA64_MaterialMeshCollisionProperties,
     ZELDA64_PT_material_mesh_collision,
+    ZELDA64_UL_mesh_collision_materials,
+    ZELDA64_PT_material_mesh_collision_overview,
     ZELDA64_OT_import_collision,
     ZELDA64_OT_search_material_by_mesh_collision_properties,
+    ZELDA64_OT_mesh_collision_merge_coplanar,
     ZELDA64_OT_mesh_collision_conveyor_direction_arrows,
+    ZELDA64_OT_mesh_collision_floor_coverage,
+    ZELDA64_OT_mesh_collision_diff,
 )
 
 
@@ -949,9 +3751,18 @@ def register():
     bpy.types.Material.z64_import_mesh_collision = bpy.props.PointerProperty(
         type=ZELDA64_MaterialMeshCollisionProperties
     )
+    subscribe_material_summaries()
+    bpy.app.handlers.load_post.append(material_summaries_load_post)
+    bpy.app.handlers.undo_post.append(material_summaries_undo_redo_post)
+    bpy.app.handlers.redo_post.append(material_summaries_undo_redo_post)
 
 
 def unregister():
+    bpy.app.handlers.redo_post.remove(material_summaries_undo_redo_post)
+    bpy.app.handlers.undo_post.remove(material_summaries_undo_redo_post)
+    bpy.app.handlers.load_post.remove(material_summaries_load_post)
+    bpy.msgbus.clear_by_owner(material_summaries_msgbus_owner)
+    invalidate_material_summaries()
     bpy.types.TOPBAR_MT_file_import.remove(menu_func_import)
     for clazz in reversed(classes):
         bpy.utils.unregister_class(clazz)